@@ -0,0 +1,23 @@
+# Generated by Django 5.2 on 2026-10-17 02:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0008_alter_userprogress_lesson_state_json"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="syllabus",
+            name="content_hash",
+            field=models.CharField(
+                blank=True,
+                default="",
+                help_text="Hash of the last saved syllabus content, used to skip no-op saves.",
+                max_length=32,
+            ),
+        ),
+    ]
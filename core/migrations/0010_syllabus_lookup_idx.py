@@ -0,0 +1,26 @@
+# Generated by Django 5.2 on 2026-10-17 02:50
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0009_syllabus_content_hash"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="syllabus",
+            name="core_syllab_topic_da9628_idx",
+        ),
+        migrations.AddIndex(
+            model_name="syllabus",
+            index=models.Index(
+                fields=["topic", "level", "user", "status", "-updated_at"],
+                name="syllabus_lookup_idx",
+            ),
+        ),
+    ]
@@ -130,6 +130,12 @@ class Syllabus(models.Model):
         db_index=True,
         help_text="The generation status of the syllabus.",
     )
+    content_hash: models.CharField = models.CharField(
+        max_length=32,
+        blank=True,
+        default="",
+        help_text="Hash of the last saved syllabus content, used to skip no-op saves.",
+    )
 
     objects = models.Manager()  # Explicitly define manager for linters
 
@@ -141,7 +147,12 @@ class Syllabus(models.Model):
         """Meta options for Syllabus."""
 
         indexes = [
-            models.Index(fields=["topic", "level"]),
+            # Covers the topic/level/user lookup in search_database and its
+            # status and recency ordering; its prefix also serves topic/level
+            models.Index(
+                fields=["topic", "level", "user", "status", "-updated_at"],
+                name="syllabus_lookup_idx",
+            ),
             models.Index(fields=["user"]),
         ]
         verbose_name = "Syllabus"
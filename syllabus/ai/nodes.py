@@ -2,19 +2,31 @@
 
 # pylint: disable=broad-exception-caught
 
+import asyncio
+import hashlib
 import json
 import logging
 import re
+import string
+import threading
 import traceback
 import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from datetime import datetime
-from typing import Any, Dict, List, Optional  # Added List, Any, cast
+from typing import Any, Dict, Iterable, List, Optional  # Added List, Any, cast
 
 import google.generativeai as genai
+from asgiref.sync import sync_to_async
 
 # Project specific imports
+from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from django.core.exceptions import ObjectDoesNotExist
+from django.db import transaction
+from django.db.models import Case, Value, When
+from django.utils import timezone
 from requests import RequestException
 from tavily import TavilyClient  # type: ignore
 
@@ -23,11 +35,53 @@ from core.models import Lesson, Module, Syllabus
 
 from .prompts import GENERATION_PROMPT_TEMPLATE, UPDATE_PROMPT_TEMPLATE
 from .state import SyllabusState
-from .utils import call_with_retry
+from .utils import acall_with_retry, call_with_retry
+
+# Prefer the fastest available JSON parser for LLM responses. orjson is the
+# declared parser; ujson and the stdlib are fallbacks if a wheel is missing
+try:
+    from orjson import loads as _json_loads
+except ImportError:
+    try:
+        from ujson import loads as _json_loads  # type: ignore[no-redef]
+    except ImportError:
+        _json_loads = json.loads  # type: ignore[assignment]
 
 logger = logging.getLogger(__name__)
 User = get_user_model()
 
+# How long a validated LLM syllabus is reused for the same topic and level
+_GENERATED_SYLLABUS_CACHE_TTL = 60 * 60 * 24
+
+# Ask Gemini for a bare JSON body, so responses carry no fences or prose and
+# parse on the fast path; the prompts already request JSON-only output
+_JSON_GENERATION_CONFIG = {"response_mime_type": "application/json"}
+
+# How long the snippets returned for a Tavily query are reused
+_TAVILY_CACHE_TTL = 60 * 60 * 24
+
+# Patterns used to pull a JSON object out of an LLM response
+_JSON_TOKEN_RE = re.compile(r'[{}"\\]')
+_ESCAPED_NL_RE = re.compile(r"\\n")
+_BAD_ESC_RE = re.compile(r"\\(?![\"\\/bfnrtu])")
+
+
+# Fields of a fresh graph state that do not depend on the call's arguments
+_INITIAL_STATE_TEMPLATE: Dict[str, Any] = {
+    "existing_syllabus": None,
+    "generated_syllabus": None,
+    "user_feedback": None,
+    "syllabus_accepted": False,
+    "iteration_count": 0,
+    "uid": None,
+    "parent_uid": None,
+    "created_at": None,
+    "updated_at": None,
+    "user_obj_pk": None,
+    "cached_syllabus": None,
+    "error_message": None,  # Initialize error message
+}
+
 
 # --- Node Functions ---
 
@@ -43,98 +97,167 @@ def initialize_state(
         raise ValueError("Topic is required")
 
     # Map the key to the display value using DIFFICULTY_KEY_TO_DISPLAY
-    knowledge_level_key = knowledge_level.lower()
+    knowledge_level_key = (
+        knowledge_level.casefold() if isinstance(knowledge_level, str) else ""
+    )
 
     knowledge_level_display = DIFFICULTY_KEY_TO_DISPLAY.get(knowledge_level_key)
     if not knowledge_level_display:
         logger.warning(
-            f"Invalid knowledge level key '{knowledge_level_key}', defaulting to {DIFFICULTY_BEGINNER}"
+            "Invalid knowledge level key '%s', defaulting to %s",
+            knowledge_level_key,
+            DIFFICULTY_BEGINNER,
         )
         knowledge_level_display = DIFFICULTY_BEGINNER
 
-    # Ensure return matches Dict[str, Any]
+    # Ensure return matches Dict[str, Any]; lists are created per call so
+    # states never share them through the template
     initial_state: Dict[str, Any] = {
+        **_INITIAL_STATE_TEMPLATE,
         "topic": topic,
         "user_knowledge_level": knowledge_level_display,
-        "existing_syllabus": None,
         "search_results": [],
-        "generated_syllabus": None,
-        "user_feedback": None,
-        "syllabus_accepted": False,
-        "iteration_count": 0,
         "user_entered_topic": topic,
         "user_id": user_id,
-        "uid": None,
         "is_master": user_id is None,
-        "parent_uid": None,
-        "created_at": None,
-        "updated_at": None,
         "search_queries": [],
-        "error_message": None,  # Initialize error message
     }
     return initial_state
 
 
+# Syllabus columns read by search_database to build the graph state
+_SEARCH_FIELDS = (
+    "syllabus_id",
+    "user_id",
+    "topic",
+    "level",
+    "user_entered_topic",
+    "status",
+    "created_at",
+    "updated_at",
+)
+
+# Rows fetched per round trip when streaming modules/lessons out of the database
+_ROW_CHUNK_SIZE = 200
+
+
+def _load_modules_list(syllabus_id: Any) -> List[Dict[str, Any]]:
+    """Builds the nested modules/lessons list for a syllabus from one joined query.
+
+    Modules are LEFT JOINed to their lessons with SQL doing the ordering, and
+    rows are read with .values() and streamed with .iterator(), so a single
+    pass groups consecutive rows by module without building model instances.
+    """
+    modules_list: List[Dict[str, Any]] = []
+    lessons: List[Dict[str, Any]] = []
+    current_module_id = None
+    for row in (
+        Module.objects.filter(syllabus_id=syllabus_id)  # pylint: disable=no-member
+        .order_by("module_index", "lessons__lesson_index")
+        .values(
+            "id",
+            "title",
+            "summary",
+            "lessons__lesson_index",
+            "lessons__title",
+            "lessons__summary",
+            "lessons__duration",
+        )
+        .iterator(chunk_size=_ROW_CHUNK_SIZE)
+    ):
+        if row["id"] != current_module_id:
+            current_module_id = row["id"]
+            lessons = []
+            modules_list.append(
+                {"title": row["title"], "summary": row["summary"], "lessons": lessons}
+            )
+        # A module without lessons still yields one row, with NULL lesson columns
+        if row["lessons__lesson_index"] is not None:
+            lessons.append(
+                {
+                    "title": row["lessons__title"],
+                    "summary": row["lessons__summary"],
+                    "duration": row["lessons__duration"],
+                }
+            )
+    return modules_list
+
+
+def _find_syllabus_candidate(
+    topic: str, knowledge_level: str, user_id: Optional[Any]
+) -> Optional[Syllabus]:
+    """Returns the preferred syllabus for a topic/level/user, or None."""
+    # Use filter instead of get to handle potential duplicates. Ordering
+    # COMPLETED rows first (then most recent) lets a single query pick
+    # the preferred candidate instead of exists/first/count round trips.
+    # Only the columns the graph state needs are read, and the user is
+    # identified by user_id rather than joining the user row.
+    return (
+        Syllabus.objects.only(*_SEARCH_FIELDS)  # pylint: disable=no-member
+        .filter(
+            topic=topic,
+            level=knowledge_level,  # Query DB using the value from state
+            user_id=user_id,  # This handles user=None correctly for master syllabi
+        )
+        .order_by(
+            Case(
+                When(status=Syllabus.StatusChoices.COMPLETED, then=Value(0)),
+                default=Value(1),
+            ),
+            "-updated_at",
+        )
+        .first()
+    )
+
+
 def search_database(state: SyllabusState) -> Dict[str, Any]:
     """Searches the database for an existing syllabus matching the criteria using Django ORM."""
-    logger.debug("Starting search_database")
     try:
         topic = state["topic"]
         knowledge_level = state["user_knowledge_level"]
         user_id = state.get("user_id")
         logger.info(
-            f"DB Search: Topic='{topic}', Level='{knowledge_level}', User={user_id}"
+            "DB Search: Topic='%s', Level='%s', User=%s",
+            topic,
+            knowledge_level,
+            user_id,
         )
 
         try:
-            user = User.objects.get(pk=user_id) if user_id else None
-        except User.DoesNotExist:
-            logger.warning(
-                f"User with ID {user_id} not found. Searching for master syllabus."
-            )
-            user = None  # Search for master syllabus if user not found
-        except ValueError as e:  # Catch invalid PK format
-            error_msg = f"Invalid User ID format '{user_id}': {e}"
-            logger.error(error_msg)
-            return {"existing_syllabus": None, "uid": None, "error_message": error_msg}
-
-        try:
-            # Use filter instead of get to handle potential duplicates
-            syllabi = (
-                Syllabus.objects.prefetch_related(  # pylint: disable=no-member
-                    "modules__lessons"  # Prefetch modules and their lessons
-                )
-                .select_related("user")
-                .filter(
-                    topic=topic,
-                    level=knowledge_level,  # Query DB using the value from state
-                    user=user,  # This handles user=None correctly for master syllabi
+            try:
+                # Filter on the raw pk: a matching syllabus proves the user
+                # exists, so the user row is only consulted when nothing matches
+                syllabus_obj = _find_syllabus_candidate(
+                    topic, knowledge_level, user_id or None
                 )
-                .order_by("-updated_at")  # Order by most recent first
-            )
-
-            syllabus_obj: Optional[Syllabus] = None  # Explicit type hint
-            if syllabi.exists():
-                # Prioritize COMPLETED status if multiple exist
-                completed_syllabus = syllabi.filter(
-                    status=Syllabus.StatusChoices.COMPLETED
-                ).first()
-                if completed_syllabus:
-                    syllabus_obj = completed_syllabus
-                    logger.info(
-                        f"Found {syllabi.count()} matching syllabi. Prioritizing COMPLETED one: "
-                        f"ID {syllabus_obj.syllabus_id}"
+                user_obj_pk = str(user_id) if user_id else None
+                if (
+                    syllabus_obj is None
+                    and user_id
+                    and not User.objects.filter(pk=user_id).exists()
+                ):
+                    logger.warning(
+                        "User with ID %s not found. Searching for master syllabus.",
+                        user_id,
                     )
-                else:
-                    # If no COMPLETED one, take the most recent non-completed one
-                    syllabus_obj = syllabi.first()
-                    if (
-                        syllabus_obj
-                    ):  # Check if first() returned something (should always)
-                        logger.info(
-                            f"Found {syllabi.count()} matching syllabi, none COMPLETED."
-                            f" Using most recent: ID {syllabus_obj.syllabus_id}, Status: {syllabus_obj.status}"
-                        )
+                    user_obj_pk = None
+                    syllabus_obj = _find_syllabus_candidate(
+                        topic, knowledge_level, None
+                    )
+            except ValueError as e:  # Catch invalid PK format
+                error_msg = f"Invalid User ID format '{user_id}': {e}"
+                logger.error("Invalid User ID format '%s': %s", user_id, e)
+                return {
+                    "existing_syllabus": None,
+                    "uid": None,
+                    "error_message": error_msg,
+                }
+            if syllabus_obj is not None:
+                logger.info(
+                    "Selected matching syllabus ID %s (status: %s)",
+                    syllabus_obj.syllabus_id,
+                    syllabus_obj.status,
+                )
 
             # Explicitly check if we failed to find/select a suitable syllabus_obj
             if syllabus_obj is None:
@@ -144,112 +267,76 @@ def search_database(state: SyllabusState) -> Dict[str, Any]:
             # --- Check status of the selected syllabus_obj ---
             if syllabus_obj.status != Syllabus.StatusChoices.COMPLETED:
                 logger.info(
-                    f"Selected syllabus {syllabus_obj.syllabus_id} is not COMPLETED "
-                    f"(status: {syllabus_obj.status}). Proceeding with generation."
+                    "Selected syllabus %s is not COMPLETED (status: %s). Proceeding with generation.",
+                    syllabus_obj.syllabus_id,
+                    syllabus_obj.status,
                 )
                 # Treat as not found for the purpose of skipping generation, but keep UID
-                logger.debug("Finished search_database")
                 return {
                     "existing_syllabus": None,
                     "uid": str(
                         syllabus_obj.syllabus_id
                     ),  # Keep UID to allow update later
+                    "user_obj_pk": user_obj_pk,
                     "error_message": None,
                 }
             # --- End status check ---
             # If we reach here, syllabus_obj is COMPLETED and we proceed to format it
             logger.info(
-                f"Using COMPLETED syllabus {syllabus_obj.syllabus_id} found in DB."
+                "Using COMPLETED syllabus %s found in DB.", syllabus_obj.syllabus_id
             )
 
             # Reconstruct the nested dictionary structure expected by the graph state
-            modules_list = []
-            for module in syllabus_obj.modules.all():  # type: ignore[attr-defined]
-                lessons_list = [
-                    {
-                        "title": lesson.title,
-                        "summary": lesson.summary,
-                        "duration": lesson.duration,
-                        # Add other relevant lesson fields if needed
-                    }
-                    for lesson in module.lessons.all()
-                ]
-                modules_list.append(
-                    {
-                        "title": module.title,
-                        "summary": module.summary,
-                        "lessons": lessons_list,
-                        # Add other relevant module fields if needed
-                    }
-                )
+            modules_list = _load_modules_list(syllabus_obj.syllabus_id)
+            owner_id = syllabus_obj.user_id  # type: ignore[attr-defined]
+            syllabus_uid = str(syllabus_obj.syllabus_id)
 
             # Create the syllabus_data dictionary matching the old structure as closely as possible
             syllabus_data = {
-                "syllabus_id": str(syllabus_obj.syllabus_id),  # Use the actual PK name
-                "uid": str(
-                    syllabus_obj.syllabus_id
-                ),  # Map uid to syllabus_id for compatibility
+                "syllabus_id": syllabus_uid,  # Use the actual PK name
+                "uid": syllabus_uid,  # Map uid to syllabus_id for compatibility
                 "topic": syllabus_obj.topic,
                 "level": syllabus_obj.level,
                 "user_entered_topic": syllabus_obj.user_entered_topic
                 or state.get("user_entered_topic", topic),
-                "user_id": (
-                    str(syllabus_obj.user.pk)
-                    if isinstance(syllabus_obj.user, User)
-                    else None
-                ),  # Added isinstance check for Mypy
-                "is_master": syllabus_obj.user is None,  # Master if no user linked
+                "user_id": str(owner_id) if owner_id is not None else None,
+                "is_master": owner_id is None,  # Master if no user linked
                 "parent_uid": None,  # Django models don't have parent_uid concept directly
-                "created_at": (
-                    syllabus_obj.created_at.isoformat()
-                    if syllabus_obj.created_at
-                    else None
-                ),
-                "updated_at": (
-                    syllabus_obj.updated_at.isoformat()
-                    if syllabus_obj.updated_at
-                    else None
-                ),
+                # Both columns are NOT NULL, so a loaded row always has them;
+                # state keeps ISO strings, as SyllabusState declares
+                "created_at": syllabus_obj.created_at.isoformat(),
+                "updated_at": syllabus_obj.updated_at.isoformat(),
                 "modules": modules_list,
-                "duration": (
-                    syllabus_obj.duration
-                    if hasattr(syllabus_obj, "duration")
-                    else "N/A"
-                ),  # Placeholder if not on model
-                "learning_objectives": (
-                    syllabus_obj.learning_objectives
-                    if hasattr(syllabus_obj, "learning_objectives")
-                    else []
-                ),  # Placeholder if not on model
+                # Placeholders: Syllabus has no duration/objectives columns
+                "duration": "N/A",
+                "learning_objectives": [],
             }
 
-            # Return the COMPLETED syllabus data
-            logger.debug("Finished search_database")
+            # Return the COMPLETED syllabus data. Only keys whose value can
+            # differ from the incoming state are updated: topic and level were
+            # the exact filter values, and parent_uid is always None here.
             return {
                 "existing_syllabus": syllabus_data,
-                "uid": syllabus_data["uid"],
+                "uid": syllabus_uid,
                 "is_master": syllabus_data["is_master"],
-                "parent_uid": syllabus_data["parent_uid"],
                 "created_at": syllabus_data["created_at"],
                 "updated_at": syllabus_data["updated_at"],
                 "user_entered_topic": syllabus_data["user_entered_topic"],
-                "topic": syllabus_data["topic"],
-                "user_knowledge_level": syllabus_data["level"],
+                "user_obj_pk": user_obj_pk,
                 "error_message": None,  # Explicitly None on success
             }
 
         except ObjectDoesNotExist:
             logger.info("No matching syllabus found in DB.")
-            logger.debug("Finished search_database")
             return {
                 "existing_syllabus": None,
                 "uid": None,
+                "user_obj_pk": user_obj_pk,
                 "error_message": None,
             }  # Return uid: None when not found, no error message here
         except Exception as e:
             error_msg = f"DB search error: {e}"
-            logger.error(f"Error searching database for syllabus: {e}", exc_info=True)
-            logger.debug("Finished search_database")
+            logger.error("Error searching database for syllabus: %s", e, exc_info=True)
             return {
                 "existing_syllabus": None,
                 "uid": None,
@@ -260,20 +347,20 @@ def search_database(state: SyllabusState) -> Dict[str, Any]:
         raise
 
 
-def search_internet(
-    state: SyllabusState, tavily_client: Optional[TavilyClient]
-) -> Dict[str, List[str]]:
-    """Performs a web search using Tavily to gather context."""
-    if not tavily_client:
-        logger.warning("Tavily client not configured. Skipping internet search.")
-        return {"search_results": ["Tavily client not available."]}
+async def asearch_database(state: SyllabusState) -> Dict[str, Any]:
+    """Async variant of search_database, used when the graph runs via astream/ainvoke.
+
+    The whole lookup runs in a single thread hop so the event loop stays free
+    for concurrent LLM/web-search work while the DB queries are in flight.
+    It stays thread-sensitive, like Django's own async ORM, so the queries
+    reuse the managed connection instead of opening one per pool thread.
+    """
+    return await sync_to_async(search_database)(state)
 
-    topic = state["topic"]
-    knowledge_level = state["user_knowledge_level"]
-    logger.info(f"Internet Search: Topic='{topic}', Level='{knowledge_level}'")
 
-    search_results: List[str] = []
-    queries = [
+def _internet_search_queries(topic: str, knowledge_level: str) -> List[tuple]:
+    """Builds the (query, params) pairs sent to Tavily for a topic and level."""
+    return [
         (
             f"{topic} syllabus curriculum outline learning objectives",
             {"include_domains": ["en.wikipedia.org", "edu"], "max_results": 2},
@@ -284,109 +371,444 @@ def search_internet(
         ),
     ]
 
-    for query, params in queries:
-        try:
-            logger.info(f"Tavily Query: {query} (Params: {params})")
+
+# Caps concurrent Tavily requests process-wide. Queries run in worker threads
+# on both graph paths, so a thread semaphore works regardless of event loop.
+_TAVILY_SLOTS = threading.BoundedSemaphore(
+    getattr(settings, "TAVILY_MAX_CONCURRENCY", 8)
+)
+
+
+def _tavily_cache_key(query: str, params: Dict[str, Any]) -> str:
+    """Returns the cache key for the snippets of one Tavily query."""
+    payload = f"{query}|{json.dumps(params, sort_keys=True)}"
+    digest = hashlib.blake2b(payload.encode(), digest_size=16).hexdigest()
+    return f"syllabus:tavily:v1:{digest}"
+
+
+def _run_tavily_query(
+    tavily_client: TavilyClient, query: str, params: Dict[str, Any]
+) -> List[str]:
+    """Runs a single Tavily query, returning content snippets or an error entry."""
+    # The level-independent query repeats across levels and users; errors are
+    # never cached so a failed search is retried next time
+    cache_key = _tavily_cache_key(query, params)
+    cached_content = cache.get(cache_key)
+    if cached_content is not None:
+        logger.info("Tavily Query (cached): %s", query)
+        return cached_content
+    try:
+        logger.info("Tavily Query: %s (Params: %s)", query, params)
+        # Bound in-flight requests across all concurrent graph runs
+        with _TAVILY_SLOTS:
             search = tavily_client.search(
                 query=query, search_depth="advanced", **params
             )
-            content = [
-                r.get("content", "")
-                for r in search.get("results", [])
-                if r.get("content")
-            ]
-            search_results.extend(content)
-            logger.info(f"Found {len(content)} results.")
-        except RequestException as e:
-            logger.warning(f"Tavily request error for query '{query}': {e}")
-            search_results.append(f"Error during web search: {str(e)}")
-        except Exception as e:
-            logger.error(
-                f"Unexpected error during Tavily search for query '{query}': {e}",
-                exc_info=True,
+        content = [
+            r.get("content", "") for r in search.get("results", []) if r.get("content")
+        ]
+        logger.info("Found %s results.", len(content))
+        cache.set(cache_key, content, _TAVILY_CACHE_TTL)
+        return content
+    except RequestException as e:
+        logger.warning("Tavily request error for query '%s': %s", query, e)
+        return [f"Error during web search: {str(e)}"]
+    except Exception as e:
+        logger.error(
+            "Unexpected error during Tavily search for query '%s': %s",
+            query,
+            e,
+            exc_info=True,
+        )
+        return [f"Unexpected error during web search: {str(e)}"]
+
+
+def _generated_syllabus_cache_key(topic: str, knowledge_level: str) -> str:
+    """Returns the cache key for a generated syllabus of a topic and level."""
+    normalized = f"{topic.strip().casefold()}|{knowledge_level}"
+    digest = hashlib.blake2b(normalized.encode(), digest_size=16).hexdigest()
+    return f"syllabus:generated:v1:{digest}"
+
+
+def _updated_syllabus_cache_key(
+    topic: str,
+    knowledge_level: str,
+    feedback: str,
+    current_syllabus: Dict[str, Any],
+) -> str:
+    """Returns the cache key for the LLM update of a syllabus with given feedback.
+
+    The feedback is compared ignoring case and spacing, and the syllabus by its
+    canonical JSON, so trivially different replays share one entry.
+    """
+    normalized_feedback = " ".join(feedback.split()).casefold()
+    canonical_syllabus = json.dumps(
+        current_syllabus, sort_keys=True, separators=(",", ":"), ensure_ascii=False
+    )
+    payload = f"{topic}|{knowledge_level}|{normalized_feedback}|{canonical_syllabus}"
+    digest = hashlib.blake2b(payload.encode(), digest_size=16).hexdigest()
+    return f"syllabus:updated:v2:{digest}"
+
+
+def _state_generated_syllabus_cache_key(state: SyllabusState) -> str:
+    """Returns the generated-syllabus cache key for the topic/level in the state."""
+    return _generated_syllabus_cache_key(state["topic"], state["user_knowledge_level"])
+
+
+def _cached_generation_skip(cached_syllabus: Dict[str, Any]) -> Dict[str, Any]:
+    """Returns the search_internet result when the generation is already cached.
+
+    The cached syllabus travels in the state so generate_syllabus uses this
+    copy rather than looking it up again, which could miss if the entry was
+    evicted or expired in between and leave it with no search results.
+    """
+    logger.info("Generated syllabus is cached. Skipping internet search.")
+    return {"search_results": [], "cached_syllabus": cached_syllabus}
+
+
+def _dedupe_search_results(snippets: Iterable[str]) -> List[str]:
+    """Drops repeated snippets, ignoring case and surrounding whitespace.
+
+    The Wikipedia and general queries often return the same passage, which would
+    otherwise be sent to the LLM twice.
+    """
+    seen = set()
+    unique = []
+    for snippet in snippets:
+        digest = hashlib.blake2b(
+            snippet.strip().casefold().encode(), digest_size=16
+        ).digest()
+        if digest not in seen:
+            seen.add(digest)
+            unique.append(snippet)
+    return unique
+
+
+def search_internet(
+    state: SyllabusState, tavily_client: Optional[TavilyClient]
+) -> Dict[str, Any]:
+    """Performs a web search using Tavily to gather context."""
+    cached_syllabus = cache.get(_state_generated_syllabus_cache_key(state))
+    if cached_syllabus is not None:
+        return _cached_generation_skip(cached_syllabus)
+    if not tavily_client:
+        logger.warning("Tavily client not configured. Skipping internet search.")
+        return {"search_results": ["Tavily client not available."]}
+
+    topic = state["topic"]
+    knowledge_level = state["user_knowledge_level"]
+    logger.info("Internet Search: Topic='%s', Level='%s'", topic, knowledge_level)
+
+    # The queries are independent network round trips, so run them side by
+    # side; map keeps the query order, and failures come back as error entries
+    queries = _internet_search_queries(topic, knowledge_level)
+    with ThreadPoolExecutor(max_workers=len(queries)) as pool:
+        query_results = list(
+            pool.map(
+                lambda query_params: _run_tavily_query(tavily_client, *query_params),
+                queries,
+            )
+        )
+    search_results = _dedupe_search_results(
+        snippet for snippets in query_results for snippet in snippets
+    )
+
+    logger.info("Total search results gathered: %s", len(search_results))
+    return {"search_results": search_results}
+
+
+async def asearch_internet(
+    state: SyllabusState, tavily_client: Optional[TavilyClient]
+) -> Dict[str, Any]:
+    """Async variant of search_internet that runs the Tavily queries concurrently."""
+    cached_syllabus = await cache.aget(_state_generated_syllabus_cache_key(state))
+    if cached_syllabus is not None:
+        return _cached_generation_skip(cached_syllabus)
+    if not tavily_client:
+        logger.warning("Tavily client not configured. Skipping internet search.")
+        return {"search_results": ["Tavily client not available."]}
+
+    topic = state["topic"]
+    knowledge_level = state["user_knowledge_level"]
+    logger.info("Internet Search: Topic='%s', Level='%s'", topic, knowledge_level)
+
+    # The queries are independent, so wait for the slowest rather than the sum.
+    # _run_tavily_query turns failures into error entries, so one bad query
+    # never cancels the group; if the node itself is cancelled, so are they.
+    async with asyncio.TaskGroup() as group:
+        tasks = [
+            group.create_task(
+                asyncio.to_thread(_run_tavily_query, tavily_client, query, params)
             )
-            search_results.append(f"Unexpected error during web search: {str(e)}")
+            for query, params in _internet_search_queries(topic, knowledge_level)
+        ]
+    search_results = _dedupe_search_results(
+        snippet for task in tasks for snippet in task.result()
+    )
 
-    logger.info(f"Total search results gathered: {len(search_results)}")
+    logger.info("Total search results gathered: %s", len(search_results))
     return {"search_results": search_results}
 
 
+def _extract_json_object(text: str) -> Optional[str]:
+    """Returns the first balanced {...} object in the text, or None.
+
+    Scanning starts inside the first code fence if there is one. The regex only
+    stops on braces, quotes and backslashes, so the text is walked once with no
+    backtracking, and braces inside JSON strings are ignored.
+    """
+    fence = text.find("```")
+    start = text.find("{", fence + 3 if fence != -1 else 0)
+    if start == -1:
+        return None
+    depth = 0
+    in_string = False
+    skip_to = start
+    for token in _JSON_TOKEN_RE.finditer(text, start):
+        pos = token.start()
+        if pos < skip_to:  # The character after a backslash is escaped
+            continue
+        char = token.group()
+        if char == "\\":
+            skip_to = pos + 2
+        elif char == '"':
+            in_string = not in_string
+        elif in_string:
+            continue
+        elif char == "{":
+            depth += 1
+        else:
+            depth -= 1
+            if depth == 0:
+                return text[start : pos + 1]
+    return None
+
+
 def _parse_llm_json_response(
     response_text: str,
 ) -> Optional[Dict[str, Any]]:  # Changed return type hint
-    """Attempts to parse a JSON object from the LLM response text."""
+    """Attempts to parse a JSON object from the LLM response text.
+
+    JSON-mode responses are normally a bare object, so that is tried first;
+    extraction and escape clean-up only run when it does not parse.
+    """
     json_str = None
     try:
-        match = re.search(r"```(?:json)?\s*({.*?})\s*```", response_text, re.DOTALL)
-        if match:
-            json_str = match.group(1)
-        else:
-            json_str = response_text.strip()
-            if not (json_str.startswith("{") and json_str.endswith("}")):
-                logger.warning("Response does not appear to be JSON or markdown block.")
-                return None
+        try:
+            parsed_json = _json_loads(response_text)
+        except ValueError:
+            parsed_json = None
+        if isinstance(parsed_json, dict):
+            return parsed_json
+
+        json_str = _extract_json_object(response_text)
+        if json_str is None:
+            logger.warning("Response does not appear to contain a JSON object.")
+            return None
 
-        json_str = re.sub(r"\\n", "", json_str)
-        json_str = re.sub(r"\\(?![\"\\/bfnrtu])", "", json_str)
+        json_str = _ESCAPED_NL_RE.sub("", json_str)
+        json_str = _BAD_ESC_RE.sub("", json_str)
 
-        parsed_json = json.loads(json_str)
+        parsed_json = _json_loads(json_str)
         if not isinstance(parsed_json, dict):
-            logger.warning(f"Parsed JSON is not a dictionary: {type(parsed_json)}")
+            logger.warning("Parsed JSON is not a dictionary: %s", type(parsed_json))
             return None
         return parsed_json  # Returns Dict[str, Any]
-    except json.JSONDecodeError as e:
-        logger.error(f"Failed to parse JSON from response: {e}")
+    except ValueError as e:  # Decode errors from every parser subclass ValueError
+        logger.error("Failed to parse JSON from response: %s", e)
         return None
     except Exception as e:
-        logger.error(f"Unexpected error during JSON parsing: {e}", exc_info=True)
+        logger.error("Unexpected error during JSON parsing: %s", e, exc_info=True)
         return None
 
 
+# Shape checked by _validate_syllabus_structure and _validate_syllabus_dict,
+# built once at import
+_SYLLABUS_REQUIRED_KEYS = frozenset(
+    ("topic", "level", "duration", "learning_objectives", "modules")
+)
+_MODULE_REQUIRED_KEYS = frozenset(("title", "lessons"))
+
+
 # pylint: disable=too-many-return-statements
 def _validate_syllabus_structure(
     syllabus: Dict[str, Any], context: str = "Generated"
 ) -> bool:  # Added type hint
     """Performs basic validation on the syllabus dictionary structure."""
-    required_keys = ["topic", "level", "duration", "learning_objectives", "modules"]
-    if not all(key in syllabus for key in required_keys):
-        logger.error(f"Error: {context} JSON missing required keys ({required_keys}).")
+    if not _SYLLABUS_REQUIRED_KEYS.issubset(syllabus.keys()):
+        logger.error(
+            "Error: %s JSON missing required keys (%s).",
+            context,
+            sorted(_SYLLABUS_REQUIRED_KEYS),
+        )
         return False
-    if not isinstance(syllabus.get("modules"), list) or not syllabus.get("modules"):
-        logger.error(f"Error: {context} JSON 'modules' must be a non-empty list.")
+    modules = syllabus["modules"]
+    if not isinstance(modules, list) or not modules:
+        logger.error("Error: %s JSON 'modules' must be a non-empty list.", context)
         return False
-    for i, module in enumerate(syllabus["modules"]):
+    for i, module in enumerate(modules):
         if not isinstance(module, dict):
-            logger.error(f"Error: {context} JSON module {i} is not a dictionary.")
+            logger.error("Error: %s JSON module %s is not a dictionary.", context, i)
             return False
-        if not all(key in module for key in ["title", "lessons"]):
+        if not _MODULE_REQUIRED_KEYS.issubset(module.keys()):
             logger.error(
-                f"Error: {context} JSON module {i} missing 'title' or 'lessons'."
+                "Error: %s JSON module %s missing 'title' or 'lessons'.", context, i
             )
             return False
-        if not isinstance(module.get("lessons"), list) or not module.get("lessons"):
+        lessons = module["lessons"]
+        if not isinstance(lessons, list) or not lessons:
             logger.error(
-                f"Error: {context} JSON module {i} 'lessons' must be a non-empty list."
+                "Error: %s JSON module %s 'lessons' must be a non-empty list.",
+                context,
+                i,
             )
             return False
-        for j, lesson in enumerate(module["lessons"]):
+        for j, lesson in enumerate(lessons):
             if not isinstance(lesson, dict):
                 logger.error(
-                    f"Error: {context} JSON lesson {j} in module {i} is not a dictionary."
+                    "Error: %s JSON lesson %s in module %s is not a dictionary.",
+                    context,
+                    j,
+                    i,
                 )
                 return False
-            if "title" not in lesson or not lesson["title"]:
+            if not lesson.get("title"):
                 logger.error(
-                    f"Error: {context} JSON lesson {j} in module {i} missing 'title'."
+                    "Error: %s JSON lesson %s in module %s missing 'title'.",
+                    context,
+                    j,
+                    i,
                 )
                 return False
-    logger.info(f"{context} JSON passed basic validation.")
+    logger.info("%s JSON passed basic validation.", context)
     return True
 
 
-def generate_syllabus(
-    state: SyllabusState, llm_model: Optional[genai.GenerativeModel]  # type: ignore[name-defined]
-) -> Dict[str, Any]:  # Changed return type hint
-    """Generates a new syllabus using the LLM based on search results."""
+# The generation prompt split around the search context, so the (possibly
+# large) search results are copied once into the final prompt string
+_GENERATION_PROMPT_HEAD, _GENERATION_PROMPT_TAIL = GENERATION_PROMPT_TEMPLATE.split(
+    "{search_context}", 1
+)
+_SOURCE_SEPARATOR = "\n\n---\n\n"
+# Upper bound on the search snippet text put into the generation prompt; the
+# model only needs an outline's worth of context, and every char is billed
+_SEARCH_CONTEXT_MAX_CHARS = 40_000
+
+
+def _build_generation_prompt(
+    topic: str, knowledge_level: str, search_results: List[str]
+) -> str:
+    """Builds the generation prompt, joining the search results in a single pass.
+
+    Snippets are added in order until _SEARCH_CONTEXT_MAX_CHARS is reached; the
+    snippet crossing the limit is truncated and the rest are dropped.
+    """
+    parts = [
+        _GENERATION_PROMPT_HEAD.format(topic=topic, knowledge_level=knowledge_level)
+    ]
+    budget = _SEARCH_CONTEXT_MAX_CHARS
+    for i, result in enumerate(search_results):
+        if result and isinstance(result, str):
+            if len(parts) > 1:
+                parts.append(_SOURCE_SEPARATOR)
+            parts.append(f"Source {i+1}:\n")
+            parts.append(result[:budget])
+            budget -= len(result)
+            if budget <= 0:
+                break
+    if len(parts) == 1:
+        parts.append(
+            "No specific search results found. Generate based on general knowledge."
+        )
+    parts.append(
+        _GENERATION_PROMPT_TAIL.format(topic=topic, knowledge_level=knowledge_level)
+    )
+    return "".join(parts)
+
+
+def _split_prompt_template(template: str) -> List[str]:
+    """Splits a str.format template into literal text and placeholder names.
+
+    Literal text sits at even indices and field names at odd ones. Parsing uses
+    str.format's own rules, so {{ and }} escapes come out as literal braces.
+    """
+    parts = [""]
+    for literal, field_name, _, _ in string.Formatter().parse(template):
+        parts[-1] += literal
+        if field_name is not None:
+            parts += [field_name, ""]
+    return parts
+
+
+# The update prompt pre-split at import, so rendering is a single join with no
+# template parsing
+_UPDATE_PROMPT_PARTS = _split_prompt_template(UPDATE_PROMPT_TEMPLATE)
+
+
+def _build_update_prompt(
+    topic: str, knowledge_level: str, syllabus_json: str, feedback: str
+) -> str:
+    """Renders the update prompt from the pre-split template."""
+    values = {
+        "topic": topic,
+        "knowledge_level": knowledge_level,
+        "syllabus_json": syllabus_json,
+        "feedback": feedback,
+    }
+    parts = _UPDATE_PROMPT_PARTS.copy()
+    parts[1::2] = [values[name] for name in _UPDATE_PROMPT_PARTS[1::2]]
+    return "".join(parts)
+
+
+def _fallback_syllabus(topic: str, knowledge_level: str) -> Dict[str, Any]:
+    """Builds the placeholder syllabus used when generation fails.
+
+    Only called on the failure path, so nothing is built when the LLM succeeds;
+    a fresh dict is returned each time because callers may mutate it.
+    """
+    return {
+        "topic": topic,
+        "level": knowledge_level.capitalize(),
+        "duration": "4 weeks (estimated)",
+        "learning_objectives": [
+            f"Understand basic concepts of {topic}.",
+            "Identify key components or principles.",
+        ],
+        "modules": [
+            {
+                "unit": 1,
+                "title": f"Introduction to {topic}",
+                "lessons": [
+                    {"title": "What is " + topic + "?"},
+                    {"title": "Core Terminology"},
+                    {"title": "Real-world Examples"},
+                ],
+            },
+            {
+                "unit": 2,
+                "title": f"Fundamental Principles of {topic}",
+                "lessons": [
+                    {"title": "Principle A"},
+                    {"title": "Principle B"},
+                    {"title": "How Principles Interact"},
+                ],
+            },
+        ],
+        "error_generating": True,
+    }
+
+
+def _generation_shortcut(
+    state: SyllabusState,
+    llm_model: Optional[genai.GenerativeModel],  # type: ignore[name-defined]
+    cached_syllabus: Optional[Dict[str, Any]],
+) -> Optional[Dict[str, Any]]:
+    """Returns the generate_syllabus result when no LLM call is needed, else None.
+
+    The cache lookup is left to the caller so the async node can use the
+    async cache API instead of blocking the event loop, and is skipped when
+    search_internet already put the cached syllabus in the state.
+    """
     if not llm_model:
         logger.warning("LLM model not configured. Cannot generate syllabus.")
         return {
@@ -399,77 +821,154 @@ def generate_syllabus(
                 "error_generating": True,
             }
         }
+    # A validated syllabus for the same topic/level is reused across users
+    if cached_syllabus is not None:
+        logger.info("Using cached generated syllabus for '%s'.", state["topic"])
+        return {"generated_syllabus": cached_syllabus}
+    return None
+
+
+def _validated_generation(response_text: str) -> Optional[Dict[str, Any]]:
+    """Parses the LLM generation response, returning it only if it validates."""
+    syllabus = _parse_llm_json_response(response_text)
+    if syllabus and _validate_syllabus_structure(syllabus, "Generated"):
+        return syllabus
+    return None
+
+
+def _generation_result(
+    topic: str, knowledge_level: str, syllabus: Optional[Dict[str, Any]]
+) -> Dict[str, Any]:
+    """Wraps a validated syllabus as the node result, or falls back if None."""
+    if syllabus is not None:
+        return {"generated_syllabus": syllabus}
+    logger.warning(
+        "Using fallback syllabus structure due to generation/parsing/validation error."
+    )
+    return {"generated_syllabus": _fallback_syllabus(topic, knowledge_level)}
+
+
+def generate_syllabus(
+    state: SyllabusState, llm_model: Optional[genai.GenerativeModel]  # type: ignore[name-defined]
+) -> Dict[str, Any]:  # Changed return type hint
+    """Generates a new syllabus using the LLM based on search results."""
+    cache_key = _state_generated_syllabus_cache_key(state)
+    cached_syllabus = state.get("cached_syllabus")
+    if cached_syllabus is None and llm_model:
+        cached_syllabus = cache.get(cache_key)
+    shortcut = _generation_shortcut(state, llm_model, cached_syllabus)
+    if shortcut is not None:
+        return shortcut
 
-    logger.info("Generating syllabus with AI...")
     topic = state["topic"]
     knowledge_level = state["user_knowledge_level"]
-    search_results = state["search_results"]
+    logger.info("Generating syllabus with AI...")
+    prompt = _build_generation_prompt(topic, knowledge_level, state["search_results"])
 
-    search_context = "\n\n---\n\n".join(
-        [
-            f"Source {i+1}:\n{result}"
-            for i, result in enumerate(search_results)
-            if result and isinstance(result, str)
-        ]
-    )
-    if not search_context:
-        search_context = (
-            "No specific search results found. Generate based on general knowledge."
+    response_text = ""
+    try:
+        logger.info("Sending generation request to LLM...")
+        response = call_with_retry(
+            llm_model.generate_content,
+            prompt,
+            generation_config=_JSON_GENERATION_CONFIG,
         )
+        response_text = response.text
+        logger.info("LLM response received.")
+    except Exception as e:
+        logger.error("LLM call failed during syllabus generation: %s", e, exc_info=True)
 
-    prompt = GENERATION_PROMPT_TEMPLATE.format(
-        topic=topic, knowledge_level=knowledge_level, search_context=search_context
-    )
+    syllabus = _validated_generation(response_text)
+    if syllabus is not None:
+        cache.set(cache_key, syllabus, _GENERATED_SYLLABUS_CACHE_TTL)
+    return _generation_result(topic, knowledge_level, syllabus)
+
+
+async def agenerate_syllabus(
+    state: SyllabusState, llm_model: Optional[genai.GenerativeModel]  # type: ignore[name-defined]
+) -> Dict[str, Any]:
+    """Async variant of generate_syllabus, awaiting Gemini without holding a thread."""
+    cache_key = _state_generated_syllabus_cache_key(state)
+    cached_syllabus = state.get("cached_syllabus")
+    if cached_syllabus is None and llm_model:
+        cached_syllabus = await cache.aget(cache_key)
+    shortcut = _generation_shortcut(state, llm_model, cached_syllabus)
+    if shortcut is not None:
+        return shortcut
+
+    topic = state["topic"]
+    knowledge_level = state["user_knowledge_level"]
+    logger.info("Generating syllabus with AI...")
+    prompt = _build_generation_prompt(topic, knowledge_level, state["search_results"])
 
     response_text = ""
     try:
         logger.info("Sending generation request to LLM...")
-        response = call_with_retry(llm_model.generate_content, prompt)
+        response = await acall_with_retry(
+            llm_model.generate_content_async,
+            prompt,
+            generation_config=_JSON_GENERATION_CONFIG,
+        )
         response_text = response.text
         logger.info("LLM response received.")
     except Exception as e:
-        logger.error(f"LLM call failed during syllabus generation: {e}", exc_info=True)
+        logger.error("LLM call failed during syllabus generation: %s", e, exc_info=True)
 
-    syllabus = _parse_llm_json_response(response_text)
+    syllabus = _validated_generation(response_text)
+    if syllabus is not None:
+        await cache.aset(cache_key, syllabus, _GENERATED_SYLLABUS_CACHE_TTL)
+    return _generation_result(topic, knowledge_level, syllabus)
 
-    if syllabus and _validate_syllabus_structure(syllabus, "Generated"):
-        return {"generated_syllabus": syllabus}
-    else:
-        logger.warning(
-            "Using fallback syllabus structure due to generation/parsing/validation error."
+
+# Update requests currently in flight, keyed by update cache key. Each entry
+# holds the key's lock and how many callers are running or waiting on it
+_UPDATE_INFLIGHT: Dict[str, List[Any]] = {}
+_UPDATE_INFLIGHT_GUARD = threading.Lock()
+
+
+@contextmanager
+def _single_flight(key: str):
+    """Runs the block for one caller per key at a time.
+
+    Concurrent callers with the same key wait for the one in progress, then
+    re-check the cache instead of repeating its LLM call.
+    """
+    with _UPDATE_INFLIGHT_GUARD:
+        entry = _UPDATE_INFLIGHT.setdefault(key, [threading.Lock(), 0])
+        entry[1] += 1
+    try:
+        with entry[0]:
+            yield
+    finally:
+        # Only the last caller out drops the entry; dropping it while others
+        # still wait would hand later callers a fresh, uncontended lock
+        with _UPDATE_INFLIGHT_GUARD:
+            entry[1] -= 1
+            if not entry[1]:
+                del _UPDATE_INFLIGHT[key]
+
+
+def _request_syllabus_update(
+    llm_model: genai.GenerativeModel, prompt: str  # type: ignore[name-defined]
+) -> Optional[Dict[str, Any]]:
+    """Sends the update prompt to the LLM, returning the validated syllabus or None."""
+    response_text = ""
+    try:
+        logger.info("Sending update request to LLM...")
+        response = call_with_retry(
+            llm_model.generate_content,
+            prompt,
+            generation_config=_JSON_GENERATION_CONFIG,
         )
-        return {
-            "generated_syllabus": {
-                "topic": topic,
-                "level": knowledge_level.capitalize(),
-                "duration": "4 weeks (estimated)",
-                "learning_objectives": [
-                    f"Understand basic concepts of {topic}.",
-                    "Identify key components or principles.",
-                ],
-                "modules": [
-                    {
-                        "unit": 1,
-                        "title": f"Introduction to {topic}",
-                        "lessons": [
-                            {"title": "What is " + topic + "?"},
-                            {"title": "Core Terminology"},
-                            {"title": "Real-world Examples"},
-                        ],
-                    },
-                    {
-                        "unit": 2,
-                        "title": f"Fundamental Principles of {topic}",
-                        "lessons": [
-                            {"title": "Principle A"},
-                            {"title": "Principle B"},
-                            {"title": "How Principles Interact"},
-                        ],
-                    },
-                ],
-                "error_generating": True,
-            }
-        }
+        response_text = response.text
+        logger.info("LLM update response received.")
+    except Exception as e:
+        logger.error("LLM call failed during syllabus update: %s", e, exc_info=True)
+
+    updated_syllabus = _parse_llm_json_response(response_text)
+    if updated_syllabus and _validate_syllabus_structure(updated_syllabus, "Updated"):
+        return updated_syllabus
+    return None
 
 
 def update_syllabus(
@@ -486,7 +985,7 @@ def update_syllabus(
         }
 
     iteration = state.get("iteration_count", 0) + 1
-    logger.info(f"Updating syllabus based on feedback (Iteration {iteration})")
+    logger.info("Updating syllabus based on feedback (Iteration %s)", iteration)
     topic = state["topic"]
     knowledge_level = state["user_knowledge_level"]
     current_syllabus = state.get("generated_syllabus") or state.get("existing_syllabus")
@@ -500,30 +999,32 @@ def update_syllabus(
             raise TypeError(
                 f"Expected dict for current_syllabus, got {type(current_syllabus)}"
             )
-        syllabus_json = json.dumps(current_syllabus, indent=2)
+        # Compact separators keep the prompt (and its token count) small
+        syllabus_json = json.dumps(
+            current_syllabus, separators=(",", ":"), ensure_ascii=False
+        )
     except TypeError as e:
-        logger.error(f"Error serializing current syllabus to JSON for update: {e}")
+        logger.error("Error serializing current syllabus to JSON for update: %s", e)
         return {"iteration_count": iteration}
 
-    prompt = UPDATE_PROMPT_TEMPLATE.format(
-        topic=topic,
-        knowledge_level=knowledge_level,
-        syllabus_json=syllabus_json,
-        feedback=feedback,
+    # Replays of the same feedback on the same syllabus reuse the validated
+    # update; identical requests in flight at once wait for the first to finish
+    cache_key = _updated_syllabus_cache_key(
+        topic, knowledge_level, feedback, current_syllabus
     )
+    with _single_flight(cache_key):
+        updated_syllabus = cache.get(cache_key)
+        if updated_syllabus is not None:
+            logger.info("Using cached syllabus update for '%s'.", topic)
+        else:
+            prompt = _build_update_prompt(
+                topic, knowledge_level, syllabus_json, feedback
+            )
+            updated_syllabus = _request_syllabus_update(llm_model, prompt)
+            if updated_syllabus is not None:
+                cache.set(cache_key, updated_syllabus, _GENERATED_SYLLABUS_CACHE_TTL)
 
-    response_text = ""
-    try:
-        logger.info("Sending update request to LLM...")
-        response = call_with_retry(llm_model.generate_content, prompt)
-        response_text = response.text
-        logger.info("LLM update response received.")
-    except Exception as e:
-        logger.error(f"LLM call failed during syllabus update: {e}", exc_info=True)
-
-    updated_syllabus = _parse_llm_json_response(response_text)
-
-    if updated_syllabus and _validate_syllabus_structure(updated_syllabus, "Updated"):
+    if updated_syllabus is not None:
         return {
             "generated_syllabus": updated_syllabus,
             "user_feedback": feedback,
@@ -539,73 +1040,132 @@ def update_syllabus(
 
 # --- Refactored save_syllabus and helpers ---
 
+# Columns needed to build the save result; everything else stays deferred
+_SAVE_RESULT_FIELDS = ("syllabus_id", "user", "created_at", "updated_at")
+_STATUS_COMPLETED = Syllabus.StatusChoices.COMPLETED
+# Template for the update_or_create defaults, filled in per save
+_DEFAULTS_TEMPLATE: Dict[str, Any] = {
+    "topic": None,
+    "level": None,
+    "user_entered_topic": None,
+    "status": _STATUS_COMPLETED,
+    "content_hash": "",
+}
+
 
 def _validate_syllabus_dict(syllabus_dict: Dict[str, Any]) -> Optional[str]:
-    required_keys = [
-        "topic",
-        "level",
-        "duration",
-        "learning_objectives",
-        "modules",
-    ]
-    missing_keys = [k for k in required_keys if k not in syllabus_dict]
+    missing_keys = _SYLLABUS_REQUIRED_KEYS - syllabus_dict.keys()
     if missing_keys:
-        return f"Syllabus data missing required keys: {', '.join(missing_keys)}."
+        return (
+            f"Syllabus data missing required keys: {', '.join(sorted(missing_keys))}."
+        )
     if not isinstance(syllabus_dict.get("modules"), list):
         return f"Syllabus 'modules' is not a list: {syllabus_dict}"
     return None
 
 
-def _get_user_obj(user_id: Optional[str]):
+def _syllabus_content_hash(
+    syllabus_dict: Dict[str, Any], topic: str, level: str, user_entered_topic: str
+) -> str:
+    """Returns a stable hash of what a save writes, used to detect no-op saves.
+
+    The state's topic, level and user-entered topic feed the Syllabus row too,
+    so they are hashed with the content; changing only one of them still saves.
+    """
+    canonical = json.dumps(
+        [syllabus_dict, topic, level, user_entered_topic],
+        sort_keys=True,
+        separators=(",", ":"),
+        default=str,
+    )
+    return hashlib.blake2b(canonical.encode(), digest_size=16).hexdigest()
+
+
+def _saved_syllabus_result(syllabus_instance: Syllabus) -> Dict[str, Any]:
+    saved_uid = str(syllabus_instance.syllabus_id)
+    return {
+        "syllabus_saved": True,
+        "saved_uid": saved_uid,
+        "uid": saved_uid,
+        # Set by auto_now_add/auto_now on save, so never None here
+        "created_at": syllabus_instance.created_at.isoformat(),
+        "updated_at": syllabus_instance.updated_at.isoformat(),
+        "is_master": syllabus_instance.user_id is None,  # type: ignore[attr-defined]
+        "error_message": None,
+    }
+
+
+def _get_user_pk(state: SyllabusState, user_id: Optional[str]):
     if not user_id:
         return None, None
+    # search_database already resolved this user earlier in the run
+    if state.get("user_obj_pk") == str(user_id):
+        return user_id, None
     try:
-        return User.objects.get(pk=user_id), None
-    except User.DoesNotExist:
+        user_pk = User.objects.filter(pk=user_id).values_list("pk", flat=True).first()
+    except ValueError as e:
+        return None, f"Invalid User ID format '{user_id}': {e}"
+    if user_pk is None:
         return (
             None,
             f"User with ID {user_id} not found. Cannot save syllabus for this user.",
         )
-    except ValueError as e:
-        return None, f"Invalid User ID format '{user_id}': {e}"
+    return user_pk, None
 
 
 def _get_or_create_syllabus_instance(
     state: SyllabusState,
     syllabus_dict: Dict[str, Any],
-    user_obj: Any,
+    user_pk: Any,
     original_topic: str,
     level_str: str,
     user_entered_topic_from_state: str,
+    content_hash: str = "",
+    existing_instance: Optional[Syllabus] = None,
 ):
-    defaults = {
-        "topic": original_topic,
-        "level": level_str,
-        "user_entered_topic": user_entered_topic_from_state,
-        "status": Syllabus.StatusChoices.COMPLETED,
-    }
+    defaults = _DEFAULTS_TEMPLATE.copy()
+    defaults["topic"] = original_topic
+    defaults["level"] = level_str
+    defaults["user_entered_topic"] = user_entered_topic_from_state
+    defaults["content_hash"] = content_hash
     uid_to_update = state.get("uid") or syllabus_dict.get("uid")
     if uid_to_update:
         try:
-            syllabus_instance = Syllabus.objects.get(syllabus_id=uid_to_update)
-            syllabus_instance.topic = syllabus_dict.get("topic", defaults["topic"])
-            syllabus_instance.level = syllabus_dict.get("level", defaults["level"])
-            syllabus_instance.user_entered_topic = syllabus_dict.get(
-                "user_entered_topic", defaults["user_entered_topic"]
-            )
-            syllabus_instance.status = str(Syllabus.StatusChoices.COMPLETED)
-            syllabus_instance.save()
-            created = False
+            # save_syllabus already looked the row up by this UID; None means
+            # it does not exist yet
+            syllabus_instance = existing_instance
+            if syllabus_instance is None:
+                # pylint: disable-next=no-member
+                syllabus_instance = Syllabus.objects.create(
+                    syllabus_id=uid_to_update,
+                    user_id=user_pk,
+                    topic=defaults["topic"],
+                    level=defaults["level"],
+                    user_entered_topic=defaults["user_entered_topic"],
+                    status=_STATUS_COMPLETED,
+                    content_hash=content_hash,
+                )
+                created = True
+            else:
+                syllabus_instance.topic = syllabus_dict.get("topic", defaults["topic"])
+                syllabus_instance.level = syllabus_dict.get("level", defaults["level"])
+                syllabus_instance.user_entered_topic = syllabus_dict.get(
+                    "user_entered_topic", defaults["user_entered_topic"]
+                )
+                syllabus_instance.status = str(_STATUS_COMPLETED)
+                syllabus_instance.content_hash = content_hash
+                syllabus_instance.save(
+                    update_fields=[
+                        "topic",
+                        "level",
+                        "user_entered_topic",
+                        "status",
+                        "content_hash",
+                        "updated_at",
+                    ]
+                )
+                created = False
         except Exception as e:
-            syllabus_instance = Syllabus.objects.create(
-                syllabus_id=uid_to_update,
-                user=user_obj,
-                topic=defaults["topic"],
-                level=defaults["level"],
-                user_entered_topic=defaults["user_entered_topic"],
-                status=Syllabus.StatusChoices.COMPLETED,
-            )
-            created = True
             return (
                 None,
                 None,
@@ -616,7 +1176,7 @@ def _get_or_create_syllabus_instance(
             syllabus_instance, created = Syllabus.objects.update_or_create(
                 topic=original_topic,
                 level=level_str,
-                user=user_obj,
+                user_id=user_pk,
                 defaults=defaults,
             )
         except Exception as e:
@@ -628,147 +1188,248 @@ def _get_or_create_syllabus_instance(
     return syllabus_instance, created, None
 
 
-def _save_modules_and_lessons(syllabus_instance, modules_data):
-    syllabus_instance.modules.all().delete()  # type: ignore[attr-defined]
+def _apply_changes(instance, values: Dict[str, Any]) -> bool:
+    """Sets the given field values on an instance, returning True if any differed."""
+    changed = False
+    for field, value in values.items():
+        if getattr(instance, field) != value:
+            setattr(instance, field, value)
+            changed = True
+    return changed
+
+
+def _save_modules_and_lessons(syllabus_id, modules_data):
+    # Bind dict.get once; the lesson loop is the hot path for large syllabi
+    _get = dict.get
+    # pylint: disable=no-member
+    # Diff against the stored rows so a small edit only touches the rows that
+    # changed. A row is only reused when both its index and its title match;
+    # a renamed or shifted entry is a different lesson, so it gets a fresh row
+    # instead of inheriting the old row's generated content and progress
+    existing_modules = {
+        module.module_index: module
+        for module in Module.objects.filter(syllabus_id=syllabus_id).only(
+            "id", "module_index", "title", "summary"
+        )
+    }
+    existing_lessons = {
+        (lesson.module_id, lesson.lesson_index): lesson  # type: ignore[attr-defined]
+        for lesson in Lesson.objects.filter(module__syllabus_id=syllabus_id).only(
+            "id", "module_id", "lesson_index", "title", "summary", "duration"
+        )
+    }
+    now = timezone.now()
+    batch_size = getattr(settings, "SYLLABUS_BULK_BATCH_SIZE", 500)
+    modules_to_create = []
+    modules_to_update = []
+    module_lessons = []
     for module_index, module_data in enumerate(modules_data):
-        if not isinstance(module_data, dict):
+        # Malformed entries are rare, so let the unbound dict.get reject them
+        # (TypeError) instead of type-checking every module and lesson
+        try:
+            values = {
+                "title": _get(
+                    module_data, "title", f"Untitled Module {module_index+1}"
+                ),
+                "summary": _get(module_data, "summary", ""),
+            }
+            lessons_data = _get(module_data, "lessons", [])
+        except TypeError:
+            logger.warning("Skipping invalid module at index %s", module_index)
             continue
-        module_title = module_data.get("title", f"Untitled Module {module_index+1}")
-        module_summary = module_data.get("summary", "")
-        lessons_data = module_data.get("lessons", [])
-        # pylint: disable=no-member
-        module_instance = Module.objects.create(
-            syllabus=syllabus_instance,
-            module_index=module_index,
-            title=module_title,
-            summary=module_summary,
+        module = _get(existing_modules, module_index)
+        if module is not None and module.title == values["title"]:
+            del existing_modules[module_index]
+            if _apply_changes(module, values):
+                module.updated_at = now
+                modules_to_update.append(module)
+        else:
+            module = Module(
+                syllabus_id=syllabus_id, module_index=module_index, **values
+            )
+            modules_to_create.append(module)
+        module_lessons.append((module, lessons_data))
+    # Whatever is left over no longer exists in the syllabus; lessons cascade
+    if existing_modules:
+        deleted_module_pks = {module.pk for module in existing_modules.values()}
+        Module.objects.filter(pk__in=deleted_module_pks).delete()
+        existing_lessons = {
+            key: lesson
+            for key, lesson in existing_lessons.items()
+            if key[0] not in deleted_module_pks
+        }
+    if modules_to_update:
+        Module.objects.bulk_update(
+            modules_to_update, ["title", "summary", "updated_at"], batch_size=batch_size
         )
+    # One INSERT per batch of new modules; PKs are populated on the objects
+    Module.objects.bulk_create(modules_to_create, batch_size=batch_size)
+
+    lessons_to_create = []
+    lessons_to_update = []
+    for module, lessons_data in module_lessons:
         if not isinstance(lessons_data, list):
             continue
         for lesson_index, lesson_data in enumerate(lessons_data):
-            if not isinstance(lesson_data, dict):
+            try:
+                values = {
+                    "title": _get(
+                        lesson_data, "title", f"Untitled Lesson {lesson_index+1}"
+                    ),
+                    "summary": _get(lesson_data, "summary", ""),
+                    "duration": _get(lesson_data, "duration"),
+                }
+            except TypeError:
                 continue
-            lesson_title = lesson_data.get("title", f"Untitled Lesson {lesson_index+1}")
-            lesson_summary = lesson_data.get("summary", "")
-            lesson_duration = lesson_data.get("duration")
-            # pylint: disable=no-member
-            Lesson.objects.create(
-                module=module_instance,
-                lesson_index=lesson_index,
-                title=lesson_title,
-                summary=lesson_summary,
-                duration=lesson_duration,
-            )
+            key = (module.pk, lesson_index)
+            lesson = _get(existing_lessons, key)
+            if lesson is not None and lesson.title == values["title"]:
+                del existing_lessons[key]
+                if _apply_changes(lesson, values):
+                    lesson.updated_at = now
+                    lessons_to_update.append(lesson)
+            else:
+                lessons_to_create.append(
+                    Lesson(module=module, lesson_index=lesson_index, **values)
+                )
+    if existing_lessons:
+        Lesson.objects.filter(
+            pk__in=[lesson.pk for lesson in existing_lessons.values()]
+        ).delete()
+    if lessons_to_update:
+        Lesson.objects.bulk_update(
+            lessons_to_update,
+            ["title", "summary", "duration", "updated_at"],
+            batch_size=batch_size,
+        )
+    Lesson.objects.bulk_create(lessons_to_create, batch_size=batch_size)
+
+
+def _save_failure(error_message: str) -> Dict[str, Any]:
+    """Builds the save_syllabus result for a failed save."""
+    return {
+        "syllabus_saved": False,
+        "saved_uid": None,
+        "error_message": error_message,
+    }
+
+
+def _read_save_inputs(state: SyllabusState):
+    """Reads and checks the state fields save_syllabus needs, in one pass.
+
+    Returns (syllabus_dict, topic, level, user_entered_topic, error_message);
+    on error the other values are None.
+    """
+    syllabus_to_save = state.get("generated_syllabus") or state.get("existing_syllabus")
+    original_topic = state.get("topic")
+    level_str = state.get("user_knowledge_level")
+    if not syllabus_to_save:
+        error_msg = "No generated syllabus content found in state"
+    elif not isinstance(syllabus_to_save, dict):
+        error_msg = f"Invalid format for syllabus_to_save: Expected dict, got {type(syllabus_to_save)}."
+    elif not original_topic or not isinstance(original_topic, str):
+        error_msg = f"Invalid or missing 'topic' in state: {original_topic}"
+    elif not level_str or not isinstance(level_str, str):
+        error_msg = f"Invalid or missing 'user_knowledge_level' in state: {level_str}"
+    else:
+        error_msg = _validate_syllabus_dict(syllabus_to_save)
+    if error_msg:
+        return None, None, None, None, error_msg
+    user_entered_topic = state.get("user_entered_topic")
+    if not user_entered_topic or not isinstance(user_entered_topic, str):
+        user_entered_topic = original_topic
+    # The syllabus is only read during the save, so it is used without copying
+    return syllabus_to_save, original_topic, level_str, user_entered_topic, None
+
+
+def _mark_syllabus_failed(uid: str) -> None:
+    """Sets a syllabus to FAILED after a save error, without raising.
+
+    The update matches no rows if the syllabus was never created; it can only
+    fail for the reasons the save did (a bad UID or an unavailable database),
+    which are logged rather than raised from the node.
+    """
+    try:
+        Syllabus.objects.filter(syllabus_id=uid).update(  # pylint: disable=no-member
+            status=Syllabus.StatusChoices.FAILED
+        )
+    except Exception as e:
+        logger.warning("Could not mark syllabus %s as FAILED: %s", uid, e)
 
 
 def save_syllabus(state: SyllabusState) -> Dict[str, Any]:
     try:
-        syllabus_to_save = state.get("generated_syllabus")
-        if not syllabus_to_save:
-            syllabus_to_save = state.get("existing_syllabus")
-            if not syllabus_to_save:
-                return {
-                    "syllabus_saved": False,
-                    "saved_uid": None,
-                    "error_message": "No generated syllabus content found in state",
-                }
-        if not isinstance(syllabus_to_save, dict):
-            error_msg = f"Invalid format for syllabus_to_save: Expected dict, got {type(syllabus_to_save)}."
-            return {
-                "syllabus_saved": False,
-                "saved_uid": None,
-                "error_message": error_msg,
-            }
-        original_topic = state.get("topic")
-        if not original_topic or not isinstance(original_topic, str):
-            error_msg = f"Invalid or missing 'topic' in state: {original_topic}"
-            return {
-                "syllabus_saved": False,
-                "saved_uid": None,
-                "error_message": error_msg,
-            }
-        user_entered_topic_from_state = state.get("user_entered_topic")
-        if not user_entered_topic_from_state or not isinstance(
-            user_entered_topic_from_state, str
-        ):
-            user_entered_topic_from_state = original_topic
-        user_id = state.get("user_id")
-        level_str = state.get("user_knowledge_level")
-        if not level_str or not isinstance(level_str, str):
-            error_msg = (
-                f"Invalid or missing 'user_knowledge_level' in state: {level_str}"
-            )
-            return {
-                "syllabus_saved": False,
-                "saved_uid": None,
-                "error_message": error_msg,
-            }
-        syllabus_dict = syllabus_to_save.copy()
-        modules_data = syllabus_dict.get("modules", [])
-        validation_error = _validate_syllabus_dict(syllabus_dict)
-        if validation_error:
-            return {
-                "syllabus_saved": False,
-                "saved_uid": None,
-                "error_message": validation_error,
-            }
-        user_obj, user_error = _get_user_obj(user_id)
-        if user_error:
-            return {
-                "syllabus_saved": False,
-                "saved_uid": None,
-                "error_message": user_error,
-            }
-        syllabus_instance, created, db_error = _get_or_create_syllabus_instance(
-            state,
+        (
             syllabus_dict,
-            user_obj,
             original_topic,
             level_str,
             user_entered_topic_from_state,
+            input_error,
+        ) = _read_save_inputs(state)
+        if input_error:
+            return _save_failure(input_error)
+        user_id = state.get("user_id")
+        modules_data = syllabus_dict.get("modules", [])
+        # Skip the rewrite entirely if this exact content is already stored
+        content_hash = _syllabus_content_hash(
+            syllabus_dict, original_topic, level_str, user_entered_topic_from_state
         )
-        if db_error or syllabus_instance is None:
-            return {
-                "syllabus_saved": False,
-                "saved_uid": None,
-                "error_message": db_error or "Unknown error during syllabus save",
-            }
-        _save_modules_and_lessons(syllabus_instance, modules_data)
-        saved_uid = str(syllabus_instance.syllabus_id)
-        return {
-            "syllabus_saved": True,
-            "saved_uid": saved_uid,
-            "uid": saved_uid,
-            "created_at": (
-                syllabus_instance.created_at.isoformat()
-                if syllabus_instance.created_at
-                else None
-            ),
-            "updated_at": (
-                syllabus_instance.updated_at.isoformat()
-                if syllabus_instance.updated_at
-                else None
-            ),
-            "is_master": syllabus_instance.user is None,
-            "error_message": None,
-        }
+        uid_to_update = state.get("uid") or syllabus_dict.get("uid")
+        user_pk, user_error = _get_user_pk(state, user_id)
+        if user_error:
+            return _save_failure(user_error)
+        # One transaction for the syllabus row and its children: a single
+        # commit, and a failure part-way leaves the previous content intact
+        with transaction.atomic():
+            existing_instance = None
+            if uid_to_update:
+                # One lookup serves both the unchanged check and the update
+                # below; the row lock makes a concurrent save of the same
+                # syllabus wait until this one commits
+                existing_instance = (
+                    Syllabus.objects.select_for_update()  # pylint: disable=no-member
+                    .only(*_SAVE_RESULT_FIELDS, "content_hash", "status")
+                    .filter(syllabus_id=uid_to_update)
+                    .first()
+                )
+                if (
+                    existing_instance is not None
+                    and existing_instance.content_hash == content_hash
+                    and existing_instance.status == _STATUS_COMPLETED
+                ):
+                    logger.info(
+                        "Syllabus %s content unchanged, skipping save.", uid_to_update
+                    )
+                    return _saved_syllabus_result(existing_instance)
+            syllabus_instance, created, db_error = _get_or_create_syllabus_instance(
+                state,
+                syllabus_dict,
+                user_pk,
+                original_topic,
+                level_str,
+                user_entered_topic_from_state,
+                content_hash,
+                existing_instance,
+            )
+            if db_error or syllabus_instance is None:
+                transaction.set_rollback(True)
+                return _save_failure(db_error or "Unknown error during syllabus save")
+            _save_modules_and_lessons(syllabus_instance.syllabus_id, modules_data)
+        return _saved_syllabus_result(syllabus_instance)
     except Exception as e:
+        logger.error("Error saving syllabus: %s", e, exc_info=True)
         syllabus_dict = (
             state.get("generated_syllabus") or state.get("existing_syllabus") or {}
         )
         uid_to_fail = state.get("uid") or syllabus_dict.get("uid")
         if uid_to_fail:
-            try:
-                Syllabus.objects.filter(syllabus_id=uid_to_fail).update(
-                    status=Syllabus.StatusChoices.FAILED
-                )  # pylint: disable=no-member
-            except Exception:
-                pass
-        return {
-            "syllabus_saved": False,
-            "saved_uid": None,
-            "error_message": f"DB save error: {e}",
-        }
+            _mark_syllabus_failed(uid_to_fail)
+        return _save_failure(f"DB save error: {e}")
+
+
+async def asave_syllabus(state: SyllabusState) -> Dict[str, Any]:
+    """Async variant of save_syllabus, used when the graph runs via astream/ainvoke."""
+    return await sync_to_async(save_syllabus)(state)
 
 
 def end_node(state: SyllabusState) -> SyllabusState:
@@ -26,3 +26,5 @@ class SyllabusState(TypedDict):
     created_at: Optional[str]  # ISO format timestamp
     updated_at: Optional[str]  # ISO format timestamp
     user_entered_topic: Optional[str]  # The original topic string entered by the user
+    user_obj_pk: Optional[str]  # User pk already verified by search_database
+    cached_syllabus: Optional[Dict[str, Any]]  # Cached generation found by search_internet
@@ -13,6 +13,7 @@ import logging
 from functools import partial
 
 # Third-party imports
+from langchain_core.runnables import RunnableLambda
 from langgraph.graph import StateGraph
 
 # First-party/Local imports
@@ -50,20 +51,29 @@ class SyllabusAI:
     
         # Note: The first argument (state) is passed automatically by LangGraph
         # search_database now only takes state, no db_service needed
-        search_internet_partial = partial(
-            nodes.search_internet, tavily_client=self.tavily_client
+        # The async variant fans the Tavily queries out concurrently
+        search_internet_node = RunnableLambda(
+            partial(nodes.search_internet, tavily_client=self.tavily_client),
+            afunc=partial(nodes.asearch_internet, tavily_client=self.tavily_client),
         )
-        generate_syllabus_partial = partial(
-            nodes.generate_syllabus, llm_model=self.llm_model
+        # The async variant awaits Gemini instead of blocking a thread on it
+        generate_syllabus_node = RunnableLambda(
+            partial(nodes.generate_syllabus, llm_model=self.llm_model),
+            afunc=partial(nodes.agenerate_syllabus, llm_model=self.llm_model),
+        )
+        # DB-bound nodes carry an async variant so astream/ainvoke can overlap
+        # their queries with other work; stream/invoke still use the sync one
+        search_database_node = RunnableLambda(
+            nodes.search_database, afunc=nodes.asearch_database
+        )
+        save_syllabus_node = RunnableLambda(
+            nodes.save_syllabus, afunc=nodes.asave_syllabus
         )
-        save_syllabus_node = nodes.save_syllabus
     
         # Add nodes using the standalone functions from nodes.py
-        workflow.add_node(
-            "search_database", nodes.search_database
-        )  # Pass function directly
-        workflow.add_node("search_internet", search_internet_partial)
-        workflow.add_node("generate_syllabus", generate_syllabus_partial)
+        workflow.add_node("search_database", search_database_node)
+        workflow.add_node("search_internet", search_internet_node)
+        workflow.add_node("generate_syllabus", generate_syllabus_node)
         workflow.add_node("save_syllabus", save_syllabus_node)
         workflow.add_node("end_node", nodes.end_node)  # Use the simple end node
     
@@ -118,46 +128,41 @@ class SyllabusAI:
             "user_id": user_id,
         }
 
-    def get_or_create_syllabus(self) -> SyllabusState:
-        """Retrieves an existing syllabus or orchestrates the creation of a new one (synchronous). Returns the full state dict."""
+    def _check_ready_for_graph(self) -> None:
+        """Raises if the agent is not ready to run the graph."""
         if not self.state:
             raise ValueError("Agent not initialized. Call initialize() first.")
         if not self.graph:
             raise RuntimeError("Graph not compiled.")
-        print("Starting get_or_create_syllabus graph execution...")
 
-        # Run the graph from the entry point ('search_database') using synchronous streaming
-        final_state_updates = {}
-        try:
-            for step in self.graph.stream(self.state, config={"recursion_limit": 10}):
-                node_name = list(step.keys())[0]
-                print(f"Graph Step: {node_name}")
-                # Accumulate all updates from the steps
-                # Ensure the update value is a dictionary
-                update_value = step[node_name]
-                if isinstance(update_value, dict):
-                    final_state_updates.update(update_value)
+    def _accumulate_step(self, step: Dict[str, Any], final_state_updates: Dict[str, Any]) -> None:
+        """Merges one streamed graph step into the accumulated state updates."""
+        node_name = list(step.keys())[0]
+        print(f"Graph Step: {node_name}")
+        # Accumulate all updates from the steps
+        # Ensure the update value is a dictionary
+        update_value = step[node_name]
+        if isinstance(update_value, dict):
+            final_state_updates.update(update_value)
+        else:
+            logger.warning(
+                f"Ignoring non-dict update from node '{node_name}': {update_value}"
+            )
+
+    def _apply_graph_updates(self, final_state_updates: Dict[str, Any]) -> SyllabusState:
+        """Applies accumulated graph updates to the state and returns it."""
+        # Apply accumulated updates to the internal state carefully
+        if final_state_updates and self.state:
+            for key, value in final_state_updates.items():
+                if key in SyllabusState.__annotations__:
+                    # Mypy might still complain about direct assignment, but it's safer than .update()
+                    self.state[key] = value  # type: ignore
                 else:
                     logger.warning(
-                        f"Ignoring non-dict update from node '{node_name}': {update_value}"
+                        f"Ignoring unexpected key '{key}' from graph execution update."
                     )
 
-            # Apply accumulated updates to the internal state carefully
-            if final_state_updates and self.state:
-                for key, value in final_state_updates.items():
-                    if key in SyllabusState.__annotations__:
-                        # Mypy might still complain about direct assignment, but it's safer than .update()
-                        self.state[key] = value  # type: ignore
-                    else:
-                        logger.warning(
-                            f"Ignoring unexpected key '{key}' from graph execution update."
-                        )
-
-        except Exception as e:
-            print(f"Error during graph execution in get_or_create_syllabus: {e}")
-            traceback.print_exc()
-            raise RuntimeError("Syllabus graph execution failed.") from e
-
+        assert self.state is not None  # Checked by _check_ready_for_graph
         # The result is the syllabus found or generated, now stored in the updated state
         syllabus = self.state.get("generated_syllabus") or self.state.get(
             "existing_syllabus"
@@ -176,6 +181,41 @@ class SyllabusAI:
         # Return the full state dictionary, not just the syllabus
         return self.state
 
+    def get_or_create_syllabus(self) -> SyllabusState:
+        """Retrieves an existing syllabus or orchestrates the creation of a new one (synchronous). Returns the full state dict."""
+        self._check_ready_for_graph()
+        print("Starting get_or_create_syllabus graph execution...")
+
+        # Run the graph from the entry point ('search_database') using synchronous streaming
+        final_state_updates: Dict[str, Any] = {}
+        try:
+            for step in self.graph.stream(self.state, config={"recursion_limit": 10}):
+                self._accumulate_step(step, final_state_updates)
+        except Exception as e:
+            print(f"Error during graph execution in get_or_create_syllabus: {e}")
+            traceback.print_exc()
+            raise RuntimeError("Syllabus graph execution failed.") from e
+
+        return self._apply_graph_updates(final_state_updates)
+
+    async def aget_or_create_syllabus(self) -> SyllabusState:
+        """Async counterpart of get_or_create_syllabus, for use from async views/consumers."""
+        self._check_ready_for_graph()
+        print("Starting aget_or_create_syllabus graph execution...")
+
+        final_state_updates: Dict[str, Any] = {}
+        try:
+            async for step in self.graph.astream(
+                self.state, config={"recursion_limit": 10}
+            ):
+                self._accumulate_step(step, final_state_updates)
+        except Exception as e:
+            print(f"Error during graph execution in aget_or_create_syllabus: {e}")
+            traceback.print_exc()
+            raise RuntimeError("Syllabus graph execution failed.") from e
+
+        return self._apply_graph_updates(final_state_updates)
+
     def get_or_create_syllabus_sync(self) -> SyllabusState:
         """Alias for get_or_create_syllabus for compatibility."""
         return self.get_or_create_syllabus()
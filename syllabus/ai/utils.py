@@ -7,6 +7,33 @@ import random
 from typing import Callable, Any, Coroutine, Awaitable # Added imports, Coroutine, Awaitable
 from google.api_core.exceptions import ResourceExhausted
 
+
+def _retry_delay(
+    func: Callable[..., Any],
+    error: ResourceExhausted,
+    retries: int,
+    max_retries: int,
+    initial_delay: float,
+) -> float:
+    """Returns the backoff before the next attempt, re-raising once retries run out."""
+    func_name = getattr(func, '__name__', 'mock_object')
+    if retries > max_retries:
+        print(f"Max retries ({max_retries}) exceeded for {func_name}.")
+        raise error
+    current_delay = initial_delay * (2 ** (retries - 1)) + random.uniform(0, 1)
+    print(
+        f"ResourceExhausted error. Retrying {func_name} in "
+        f"{current_delay:.2f} seconds... (Attempt {retries}/{max_retries})"
+    )
+    return current_delay
+
+
+def _report_non_retryable(func: Callable[..., Any], error: Exception) -> None:
+    """Reports an error that call_with_retry passes straight through."""
+    func_name = getattr(func, '__name__', 'mock_object')
+    print(f"Non-retryable error during {func_name} call: {error}")
+
+
 # Added type annotations
 def call_with_retry(
     func: Callable[..., Any],
@@ -17,25 +44,34 @@ def call_with_retry(
 ) -> Any:
     """Calls a function with exponential backoff retry logic for ResourceExhausted errors."""
     retries = 0
-    delay = initial_delay
     while True:
         try:
-            result = func(*args, **kwargs)
-            return result
+            return func(*args, **kwargs)
+        except ResourceExhausted as e:
+            retries += 1
+            time.sleep(_retry_delay(func, e, retries, max_retries, initial_delay))
+        except Exception as e:
+            _report_non_retryable(func, e)
+            raise
+
+
+async def acall_with_retry(
+    func: Callable[..., Awaitable[Any]],
+    *args: Any,
+    max_retries: int = 5,
+    initial_delay: float = 1.0,
+    **kwargs: Any
+) -> Any:
+    """Async variant of call_with_retry; awaits func and backs off without blocking the loop."""
+    retries = 0
+    while True:
+        try:
+            return await func(*args, **kwargs)
         except ResourceExhausted as e:
             retries += 1
-            if retries > max_retries:
-                func_name = getattr(func, '__name__', 'mock_object')
-                print(f"Max retries ({max_retries}) exceeded for {func_name}.")
-                raise e
-            current_delay = delay * (2 ** (retries - 1)) + random.uniform(0, 1)
-            func_name = getattr(func, '__name__', 'mock_object')
-            print(
-                f"ResourceExhausted error. Retrying {func_name} in "
-                f"{current_delay:.2f} seconds... (Attempt {retries}/{max_retries})"
+            await asyncio.sleep(
+                _retry_delay(func, e, retries, max_retries, initial_delay)
             )
-            time.sleep(current_delay)
         except Exception as e:
-            func_name = getattr(func, '__name__', 'mock_object')
-            print(f"Non-retryable error during {func_name} call: {e}")
-            raise e
+            _report_non_retryable(func, e)
+            raise
@@ -0,0 +1,218 @@
+"""Tests for the generate_syllabus node function."""
+
+# pylint: disable=redefined-outer-name
+
+import json
+import threading
+from typing import cast
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from django.core.cache import cache
+from django.core.cache.backends.locmem import LocMemCache
+
+from syllabus.ai import nodes
+from syllabus.ai.nodes import (
+    _build_generation_prompt,
+    agenerate_syllabus,
+    asearch_internet,
+    generate_syllabus,
+    initialize_state,
+    search_internet,
+)
+from syllabus.ai.prompts import GENERATION_PROMPT_TEMPLATE
+from syllabus.ai.state import SyllabusState
+
+VALID_SYLLABUS = {
+    "topic": "Cached Topic",
+    "level": "Beginner",
+    "duration": "2 weeks",
+    "learning_objectives": ["Learn caching"],
+    "modules": [{"title": "Cache Module", "lessons": [{"title": "Cache Lesson"}]}],
+}
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """Fixture that isolates each test from cached generations."""
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.fixture
+def generate_state():
+    """Fixture for a state ready for generation."""
+    return cast(
+        SyllabusState,
+        initialize_state(None, topic="Cached Topic", knowledge_level="beginner"),
+    )
+
+
+@pytest.fixture
+def llm_model():
+    """Fixture for an LLM returning a valid syllabus."""
+    model = MagicMock()
+    model.generate_content.return_value.text = json.dumps(VALID_SYLLABUS)
+    return model
+
+
+# --- Test generate_syllabus ---
+
+
+def test_generate_syllabus_returns_parsed_llm_output(generate_state, llm_model):
+    """Test that a valid LLM response becomes the generated syllabus."""
+    result = generate_syllabus(generate_state, llm_model)
+
+    assert result == {"generated_syllabus": VALID_SYLLABUS}
+    llm_model.generate_content.assert_called_once()
+    _, kwargs = llm_model.generate_content.call_args
+    assert kwargs["generation_config"] == {"response_mime_type": "application/json"}
+
+
+def test_generate_syllabus_reuses_cached_generation(generate_state, llm_model):
+    """Test that the same topic and level is only sent to the LLM once."""
+    generate_syllabus(generate_state, llm_model)
+    repeat_state = cast(
+        SyllabusState,
+        initialize_state(None, topic=" cached topic ", knowledge_level="Beginner"),
+    )
+
+    result = generate_syllabus(repeat_state, llm_model)
+
+    assert result == {"generated_syllabus": VALID_SYLLABUS}
+    llm_model.generate_content.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_agenerate_syllabus_awaits_async_llm(generate_state):
+    """Test that the async variant awaits Gemini and shares the cache."""
+    model = MagicMock()
+    model.generate_content_async = AsyncMock(
+        return_value=MagicMock(text=json.dumps(VALID_SYLLABUS))
+    )
+
+    result = await agenerate_syllabus(generate_state, model)
+
+    assert result == {"generated_syllabus": VALID_SYLLABUS}
+    model.generate_content_async.assert_awaited_once()
+    model.generate_content.assert_not_called()
+    # The sync node now finds the async result in the cache
+    assert generate_syllabus(generate_state, model) == result
+    model.generate_content.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_async_nodes_keep_cache_io_off_event_loop(generate_state, monkeypatch):
+    """Test that the async nodes never call the sync cache on the event loop thread."""
+    cache_threads = []
+    for name in ("get", "set", "has_key"):
+
+        def record(self, *args, _original=getattr(LocMemCache, name), **kwargs):
+            cache_threads.append(threading.get_ident())
+            return _original(self, *args, **kwargs)
+
+        monkeypatch.setattr(LocMemCache, name, record)
+    model = MagicMock()
+    model.generate_content_async = AsyncMock(
+        return_value=MagicMock(text=json.dumps(VALID_SYLLABUS))
+    )
+
+    await asearch_internet(generate_state, None)
+    await agenerate_syllabus(generate_state, model)
+
+    assert len(cache_threads) == 3
+    assert threading.get_ident() not in cache_threads
+
+
+def test_search_internet_skipped_when_generation_cached(generate_state, llm_model):
+    """Test that a cached generation also skips the web search."""
+    generate_syllabus(generate_state, llm_model)
+    tavily_client = MagicMock()
+
+    result = search_internet(generate_state, tavily_client)
+
+    assert result == {"search_results": [], "cached_syllabus": VALID_SYLLABUS}
+    tavily_client.search.assert_not_called()
+
+
+def test_generate_syllabus_uses_syllabus_found_by_search(generate_state, llm_model):
+    """Test that a cache entry evicted after the search skip is not regenerated."""
+    generate_syllabus(generate_state, llm_model)
+    generate_state.update(search_internet(generate_state, MagicMock()))
+    cache.clear()
+
+    result = generate_syllabus(generate_state, llm_model)
+
+    assert result == {"generated_syllabus": VALID_SYLLABUS}
+    llm_model.generate_content.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_agenerate_syllabus_uses_syllabus_found_by_search(
+    generate_state, llm_model
+):
+    """Test that the async nodes also hand the cached syllabus through the state."""
+    generate_syllabus(generate_state, llm_model)
+    generate_state.update(await asearch_internet(generate_state, MagicMock()))
+    cache.clear()
+    llm_model.generate_content_async = AsyncMock()
+
+    result = await agenerate_syllabus(generate_state, llm_model)
+
+    assert result == {"generated_syllabus": VALID_SYLLABUS}
+    llm_model.generate_content_async.assert_not_awaited()
+
+
+def test_generate_syllabus_does_not_cache_fallback(generate_state):
+    """Test that a failed generation is not cached."""
+    broken_model = MagicMock()
+    broken_model.generate_content.return_value.text = "not json"
+
+    first = generate_syllabus(generate_state, broken_model)["generated_syllabus"]
+    second = generate_syllabus(generate_state, broken_model)["generated_syllabus"]
+
+    assert broken_model.generate_content.call_count == 2
+    assert first["error_generating"] is True
+    assert first["modules"][0]["title"] == "Introduction to Cached Topic"
+    # Each failure gets its own fallback dict
+    assert first == second and first is not second
+
+
+@pytest.mark.parametrize(
+    "search_results, search_context",
+    [
+        (
+            ["First {snippet}", "", "Second"],
+            "Source 1:\nFirst {snippet}\n\n---\n\nSource 3:\nSecond",
+        ),
+        (
+            [],
+            "No specific search results found. Generate based on general knowledge.",
+        ),
+    ],
+)
+def test_build_generation_prompt_matches_template(search_results, search_context):
+    """Test that the single-pass prompt equals formatting the full template."""
+    prompt = _build_generation_prompt("Prompt {Topic}", "Beginner", search_results)
+
+    assert prompt == GENERATION_PROMPT_TEMPLATE.format(
+        topic="Prompt {Topic}",
+        knowledge_level="Beginner",
+        search_context=search_context,
+    )
+
+
+def test_build_generation_prompt_caps_search_context(monkeypatch):
+    """Test that search snippets stop once the context budget is spent."""
+    monkeypatch.setattr(nodes, "_SEARCH_CONTEXT_MAX_CHARS", 10)
+
+    prompt = _build_generation_prompt(
+        "Capped", "Beginner", ["123456", "abcdefgh", "never included"]
+    )
+
+    assert prompt == GENERATION_PROMPT_TEMPLATE.format(
+        topic="Capped",
+        knowledge_level="Beginner",
+        search_context="Source 1:\n123456\n\n---\n\nSource 2:\nabcd",
+    )
@@ -2,7 +2,11 @@
 
 from typing import cast
 
-from core.constants import DIFFICULTY_ADVANCED, DIFFICULTY_GOOD_KNOWLEDGE
+from core.constants import (
+    DIFFICULTY_ADVANCED,
+    DIFFICULTY_BEGINNER,
+    DIFFICULTY_GOOD_KNOWLEDGE,
+)
 from syllabus.ai.nodes import initialize_state
 from syllabus.ai.state import SyllabusState
 
@@ -56,3 +60,14 @@ def test_initialize_state_without_user():
     assert state["is_master"] is True  # Should default to True when no user_id
     assert state["existing_syllabus"] is None
     assert state["generated_syllabus"] is None
+
+
+def test_initialize_state_normalizes_knowledge_level():
+    """Test that level keys are matched case-insensitively and unknown ones default."""
+    state = initialize_state(None, topic="Level Topic", knowledge_level="ADVANCED")
+    fallback = initialize_state(None, topic="Level Topic", knowledge_level="expert")
+
+    assert state["user_knowledge_level"] == DIFFICULTY_ADVANCED
+    assert fallback["user_knowledge_level"] == DIFFICULTY_BEGINNER
+    # Each state gets its own lists rather than sharing the template's
+    assert state["search_results"] is not fallback["search_results"]
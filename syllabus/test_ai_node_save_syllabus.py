@@ -3,16 +3,19 @@
 # pylint: disable=redefined-outer-name, no-member, unused-argument
 
 from typing import cast
+from unittest.mock import patch
 
 import pytest
 from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 
 from core.constants import (
     DIFFICULTY_ADVANCED,
     DIFFICULTY_GOOD_KNOWLEDGE,
     DIFFICULTY_BEGINNER,
 )
-from core.models import Lesson, Module, Syllabus
+from core.models import Lesson, LessonContent, Module, Syllabus
 from syllabus.ai.nodes import initialize_state, save_syllabus
 from syllabus.ai.state import SyllabusState
 
@@ -54,7 +57,7 @@ def existing_user_syllabus(test_user):
 
 
 @pytest.mark.django_db
-def test_save_syllabus_create_new(test_user):
+def test_save_syllabus_create_new(test_user, django_assert_num_queries):
     """Test saving a newly generated syllabus for a user."""
     topic = "Save New Topic"
     level = "beginner"
@@ -89,8 +92,11 @@ def test_save_syllabus_create_new(test_user):
     initial_state = cast(SyllabusState, initial_state_dict)
     initial_state["generated_syllabus"] = generated_syllabus_content
 
-    # Call the node function
-    result_state_dict = save_syllabus(initial_state)
+    # Call the node function. User check, syllabus lookup and insert, the two
+    # module/lesson diff reads, then one INSERT for all modules and one for all
+    # lessons; the remaining statements are transaction savepoints
+    with django_assert_num_queries(13):
+        result_state_dict = save_syllabus(initial_state)
     result_state = cast(SyllabusState, result_state_dict)
 
     # Assertions on the returned state
@@ -201,9 +207,18 @@ def test_save_syllabus_update_existing(existing_user_syllabus):
     )
 
     # Call the node function
-    result_state_dict = save_syllabus(initial_state)
+    with CaptureQueriesContext(connection) as queries:
+        result_state_dict = save_syllabus(initial_state)
     result_state = cast(SyllabusState, result_state_dict)
 
+    # The syllabus row is read once, for both the unchanged check and the update
+    syllabus_selects = [
+        q["sql"]
+        for q in queries.captured_queries
+        if q["sql"].startswith("SELECT") and 'FROM "core_syllabus"' in q["sql"]
+    ]
+    assert len(syllabus_selects) == 1
+
     # Assertions on the returned state
     assert result_state["syllabus_saved"] is True
     assert result_state["saved_uid"] == existing_uid  # Should return the same UID
@@ -324,3 +339,291 @@ def test_save_syllabus_invalid_user_id(test_user):
     assert (
         "Invalid User ID format 'nonexistent-user-pk'" in result_state["error_message"]
     )
+
+
+@pytest.mark.django_db
+def test_save_syllabus_unchanged_content_skips_rewrite(test_user):
+    """Test that re-saving identical content leaves modules/lessons untouched."""
+    topic = "Unchanged Save Topic"
+    level = "beginner"
+    generated_syllabus_content = {
+        "topic": topic,
+        "level": DIFFICULTY_BEGINNER,
+        "duration": 20,
+        "learning_objectives": ["Learn idempotent saves"],
+        "modules": [
+            {
+                "title": "Unchanged Module 1",
+                "lessons": [{"title": "Unchanged Lesson 1.1", "duration": 5}],
+            }
+        ],
+    }
+    initial_state = cast(
+        SyllabusState,
+        initialize_state(
+            None, topic=topic, knowledge_level=level, user_id=str(test_user.pk)
+        ),
+    )
+    initial_state["generated_syllabus"] = generated_syllabus_content
+
+    first_result = save_syllabus(initial_state)
+    saved_uid = first_result["saved_uid"]
+    module_pk = Module.objects.get(syllabus_id=saved_uid).pk
+
+    initial_state["uid"] = saved_uid
+    second_result = save_syllabus(initial_state)
+
+    assert second_result["syllabus_saved"] is True
+    assert second_result["saved_uid"] == saved_uid
+    assert second_result["error_message"] is None
+    # The module row was not deleted and recreated
+    assert Module.objects.get(syllabus_id=saved_uid).pk == module_pk
+
+
+@pytest.mark.django_db
+def test_save_syllabus_same_content_new_entered_topic_is_saved(test_user):
+    """Test that a changed user-entered topic is written even if the content is not."""
+    topic = "Entered Topic Save"
+    initial_state = cast(
+        SyllabusState,
+        initialize_state(
+            None, topic=topic, knowledge_level="beginner", user_id=str(test_user.pk)
+        ),
+    )
+    initial_state["generated_syllabus"] = {
+        "topic": topic,
+        "level": DIFFICULTY_BEGINNER,
+        "duration": 20,
+        "learning_objectives": [],
+        "modules": [{"title": "Entered Module", "lessons": []}],
+    }
+    saved_uid = save_syllabus(initial_state)["saved_uid"]
+
+    initial_state["uid"] = saved_uid
+    initial_state["user_entered_topic"] = "entered topic save, please"
+    result_state = save_syllabus(initial_state)
+
+    assert result_state["syllabus_saved"] is True
+    saved_syllabus = Syllabus.objects.get(pk=saved_uid)
+    assert saved_syllabus.user_entered_topic == "entered topic save, please"
+
+
+@pytest.mark.django_db
+def test_save_syllabus_unknown_uid_creates_record():
+    """Test that a UID with no matching row is created rather than reported as an error."""
+    new_uid = "5f0c6c4e-2f7a-4f43-9b55-0a6b1a3f7e10"
+    generated_syllabus_content = {
+        "topic": "Unknown UID Topic",
+        "level": DIFFICULTY_BEGINNER,
+        "duration": 10,
+        "learning_objectives": [],
+        "modules": [{"title": "Unknown UID Module", "lessons": []}],
+    }
+    initial_state = cast(
+        SyllabusState,
+        initialize_state(None, topic="Unknown UID Topic", knowledge_level="beginner"),
+    )
+    initial_state["uid"] = new_uid
+    initial_state["generated_syllabus"] = generated_syllabus_content
+
+    result_state = save_syllabus(initial_state)
+
+    assert result_state["syllabus_saved"] is True
+    assert result_state["saved_uid"] == new_uid
+    assert result_state["error_message"] is None
+    assert Syllabus.objects.get(pk=new_uid).modules.count() == 1
+
+
+@pytest.mark.django_db
+def test_save_syllabus_failure_keeps_previous_content(existing_user_syllabus):
+    """Test that a failure while writing lessons rolls back the module replacement."""
+    existing_uid = str(existing_user_syllabus.syllabus_id)
+    initial_state = cast(
+        SyllabusState,
+        initialize_state(
+            None,
+            topic="Existing Save Topic",
+            knowledge_level="good knowledge",
+            user_id=str(existing_user_syllabus.user_id),
+        ),
+    )
+    initial_state["uid"] = existing_uid
+    initial_state["generated_syllabus"] = {
+        "topic": "Existing Save Topic",
+        "level": DIFFICULTY_GOOD_KNOWLEDGE,
+        "duration": 10,
+        "learning_objectives": [],
+        "modules": [
+            {"title": "Replacement Module", "lessons": [{"title": "New Lesson"}]}
+        ],
+    }
+
+    with patch.object(
+        Lesson.objects, "bulk_create", side_effect=RuntimeError("insert failed")
+    ):
+        result_state = save_syllabus(initial_state)
+
+    assert result_state["syllabus_saved"] is False
+    assert "insert failed" in result_state["error_message"]
+    modules = list(Module.objects.filter(syllabus_id=existing_uid))
+    assert [module.title for module in modules] == ["Existing Save Mod 1"]
+    assert modules[0].lessons.count() == 1
+    # The rolled-back syllabus is flagged so it gets regenerated
+    assert Syllabus.objects.get(pk=existing_uid).status == Syllabus.StatusChoices.FAILED
+
+
+@pytest.mark.django_db
+def test_save_syllabus_reuses_verified_user_pk(test_user):
+    """Test that a user already verified by search_database is not looked up again."""
+    initial_state = cast(
+        SyllabusState,
+        initialize_state(
+            None,
+            topic="Verified User Topic",
+            knowledge_level="beginner",
+            user_id=str(test_user.pk),
+        ),
+    )
+    initial_state["user_obj_pk"] = str(test_user.pk)
+    initial_state["generated_syllabus"] = {
+        "topic": "Verified User Topic",
+        "level": DIFFICULTY_BEGINNER,
+        "duration": 10,
+        "learning_objectives": [],
+        "modules": [{"title": "Verified Module", "lessons": []}],
+    }
+
+    with patch.object(User.objects, "filter", side_effect=AssertionError):
+        result_state = save_syllabus(initial_state)
+
+    assert result_state["syllabus_saved"] is True
+    assert Syllabus.objects.get(pk=result_state["saved_uid"]).user_id == test_user.pk
+
+
+@pytest.mark.django_db
+def test_save_syllabus_update_only_touches_changed_rows(existing_user_syllabus):
+    """Test that updating a syllabus only reuses rows whose index and title match."""
+    existing_uid = str(existing_user_syllabus.syllabus_id)
+    module = existing_user_syllabus.modules.get(module_index=0)
+    kept_lesson = module.lessons.get(lesson_index=0)
+    LessonContent.objects.create(lesson=kept_lesson, content={"kept": True})
+    renamed_lesson = Lesson.objects.create(
+        module=module, lesson_index=1, title="Original Lesson 1.2"
+    )
+    LessonContent.objects.create(lesson=renamed_lesson, content={"stale": True})
+    Lesson.objects.create(module=module, lesson_index=2, title="Dropped Lesson")
+    replaced_module = Module.objects.create(
+        syllabus=existing_user_syllabus, module_index=1, title="Replaced Module"
+    )
+    initial_state = cast(
+        SyllabusState,
+        initialize_state(
+            None,
+            topic="Existing Save Topic",
+            knowledge_level="good knowledge",
+            user_id=str(existing_user_syllabus.user_id),
+        ),
+    )
+    initial_state["uid"] = existing_uid
+    initial_state["generated_syllabus"] = {
+        "topic": "Existing Save Topic",
+        "level": DIFFICULTY_GOOD_KNOWLEDGE,
+        "duration": 10,
+        "learning_objectives": [],
+        "modules": [
+            {
+                "title": "Existing Save Mod 1",
+                "summary": "",
+                "lessons": [
+                    {"title": "Existing Save Lsn 1.1", "summary": "New", "duration": 5},
+                    {"title": "Renamed Lesson 1.2"},
+                ],
+            },
+            {"title": "Added Module", "lessons": [{"title": "Added Lesson"}]},
+        ],
+    }
+
+    result_state = save_syllabus(initial_state)
+
+    assert result_state["syllabus_saved"] is True
+    assert Module.objects.get(syllabus_id=existing_uid, module_index=0).pk == module.pk
+    lessons = Lesson.objects.filter(module__syllabus_id=existing_uid)
+    assert [(l.module.module_index, l.lesson_index, l.title) for l in lessons] == [
+        (0, 0, "Existing Save Lsn 1.1"),
+        (0, 1, "Renamed Lesson 1.2"),
+        (1, 0, "Added Lesson"),
+    ]
+    assert lessons[0].pk == kept_lesson.pk
+    assert lessons[0].summary == "New"
+    assert lessons[1].pk != renamed_lesson.pk
+    assert lessons[2].module.pk != replaced_module.pk
+    assert list(LessonContent.objects.values_list("lesson_id", flat=True)) == [
+        kept_lesson.pk
+    ]
+
+
+@pytest.mark.django_db
+def test_save_syllabus_respects_bulk_batch_size(settings, test_user):
+    """Test that modules and lessons are all written with a small batch size."""
+    settings.SYLLABUS_BULK_BATCH_SIZE = 1
+    initial_state = cast(
+        SyllabusState,
+        initialize_state(
+            None,
+            topic="Batched Topic",
+            knowledge_level="beginner",
+            user_id=str(test_user.pk),
+        ),
+    )
+    initial_state["generated_syllabus"] = {
+        "topic": "Batched Topic",
+        "level": DIFFICULTY_BEGINNER,
+        "duration": 10,
+        "learning_objectives": [],
+        "modules": [
+            {
+                "title": f"Batch Module {i}",
+                "lessons": [{"title": "A"}, {"title": "B"}],
+            }
+            for i in range(2)
+        ],
+    }
+
+    result_state = save_syllabus(initial_state)
+
+    saved_uid = result_state["saved_uid"]
+    assert Module.objects.filter(syllabus_id=saved_uid).count() == 2
+    assert Lesson.objects.filter(module__syllabus_id=saved_uid).count() == 4
+
+
+@pytest.mark.django_db
+def test_save_syllabus_skips_malformed_modules_and_lessons(test_user):
+    """Test that non-dict modules and lessons are skipped, keeping indices."""
+    initial_state = cast(
+        SyllabusState,
+        initialize_state(
+            None,
+            topic="Malformed Topic",
+            knowledge_level="beginner",
+            user_id=str(test_user.pk),
+        ),
+    )
+    initial_state["generated_syllabus"] = {
+        "topic": "Malformed Topic",
+        "level": DIFFICULTY_BEGINNER,
+        "duration": 10,
+        "learning_objectives": [],
+        "modules": [
+            "not a module",
+            {"title": "Good Module", "lessons": [None, {"title": "Good Lesson"}]},
+        ],
+    }
+
+    result_state = save_syllabus(initial_state)
+
+    assert result_state["syllabus_saved"] is True
+    saved_uid = result_state["saved_uid"]
+    modules = Module.objects.filter(syllabus_id=saved_uid)
+    assert [(m.module_index, m.title) for m in modules] == [(1, "Good Module")]
+    lessons = Lesson.objects.filter(module__syllabus_id=saved_uid)
+    assert [(l.lesson_index, l.title) for l in lessons] == [(1, "Good Lesson")]
@@ -9,8 +9,9 @@ from django.contrib.auth import get_user_model
 
 from core.constants import DIFFICULTY_ADVANCED, DIFFICULTY_GOOD_KNOWLEDGE
 from core.models import Lesson, Module, Syllabus
-from syllabus.ai.nodes import initialize_state, search_database
+from syllabus.ai.nodes import asearch_database, initialize_state, search_database
 from syllabus.ai.state import SyllabusState
+from syllabus.ai.syllabus_graph import SyllabusAI
 
 User = get_user_model()
 
@@ -73,7 +74,9 @@ def existing_master_syllabus():
 
 
 @pytest.mark.django_db
-def test_search_database_finds_user_syllabus(test_user, existing_user_syllabus):
+def test_search_database_finds_user_syllabus(
+    test_user, existing_user_syllabus, django_assert_num_queries
+):
     """Test finding an existing syllabus for a specific user."""
     initial_state_dict = initialize_state(
         None,
@@ -83,7 +86,9 @@ def test_search_database_finds_user_syllabus(test_user, existing_user_syllabus):
     )
     initial_state = cast(SyllabusState, initial_state_dict)
 
-    result_state_dict = search_database(initial_state)
+    # The candidate syllabus, then the joined module and lesson rows
+    with django_assert_num_queries(2):
+        result_state_dict = search_database(initial_state)
     result_state = cast(SyllabusState, result_state_dict)
 
     assert result_state["existing_syllabus"] is not None
@@ -102,6 +107,11 @@ def test_search_database_finds_user_syllabus(test_user, existing_user_syllabus):
         result_state["existing_syllabus"]["modules"][0]["lessons"][0]["title"]
         == "User Lsn 1.1"
     )
+    assert result_state["existing_syllabus"]["modules"][0] == {
+        "title": "User Mod 1",
+        "summary": None,
+        "lessons": [{"title": "User Lsn 1.1", "summary": None, "duration": 5}],
+    }
     assert result_state["error_message"] is None
 
 
@@ -131,6 +141,26 @@ def test_search_database_finds_master_syllabus(existing_master_syllabus):
     assert result_state["error_message"] is None
 
 
+@pytest.mark.django_db
+def test_search_database_unknown_user_falls_back_to_master(existing_master_syllabus):
+    """Test that a user ID with no matching user searches for the master syllabus."""
+    initial_state = cast(
+        SyllabusState,
+        initialize_state(
+            None,
+            topic="Master DB Test Topic",
+            knowledge_level="advanced",
+            user_id="999999",
+        ),
+    )
+
+    result_state = search_database(initial_state)
+
+    assert result_state["uid"] == str(existing_master_syllabus.syllabus_id)
+    assert result_state["user_obj_pk"] is None
+    assert result_state["error_message"] is None
+
+
 @pytest.mark.django_db
 def test_search_database_not_found(test_user):
     """Test when no matching syllabus is found in the database."""
@@ -168,3 +198,78 @@ def test_search_database_no_user_id_provided():
     assert result_state["existing_syllabus"] is None
     assert result_state["uid"] is None
     assert result_state["error_message"] is None
+
+
+@pytest.mark.asyncio
+@pytest.mark.django_db(transaction=True)
+async def test_asearch_database_matches_sync(test_user, existing_user_syllabus):
+    """Test that the async variant returns the same result as search_database."""
+    initial_state = cast(
+        SyllabusState,
+        initialize_state(
+            None,
+            topic="User DB Test Topic",
+            knowledge_level="good knowledge",
+            user_id=str(test_user.pk),
+        ),
+    )
+
+    result_state = await asearch_database(initial_state)
+
+    assert result_state["uid"] == str(existing_user_syllabus.syllabus_id)
+    assert result_state["existing_syllabus"]["modules"][0]["title"] == "User Mod 1"
+    assert result_state["error_message"] is None
+
+
+@pytest.mark.asyncio
+@pytest.mark.django_db(transaction=True)
+async def test_aget_or_create_syllabus_finds_existing(
+    test_user, existing_user_syllabus
+):
+    """Test that the async graph run routes through asearch_database to the stored syllabus."""
+    syllabus_ai = SyllabusAI()
+    syllabus_ai.initialize(
+        "User DB Test Topic", "good knowledge", user_id=str(test_user.pk)
+    )
+
+    result_state = await syllabus_ai.aget_or_create_syllabus()
+
+    assert result_state["uid"] == str(existing_user_syllabus.syllabus_id)
+    assert result_state["existing_syllabus"]["modules"][0]["title"] == "User Mod 1"
+    assert await Syllabus.objects.acount() == 1
+
+
+@pytest.mark.django_db
+def test_search_database_prefers_completed_over_newer_pending(
+    test_user, existing_user_syllabus, django_assert_num_queries
+):
+    """Test that an older COMPLETED syllabus wins over a newer non-completed one."""
+    Module.objects.create(
+        syllabus=existing_user_syllabus, module_index=1, title="Empty Mod 2"
+    )  # pylint: disable=no-member
+    Syllabus.objects.create(
+        user=test_user,
+        topic="User DB Test Topic",
+        level=DIFFICULTY_GOOD_KNOWLEDGE,
+        status=Syllabus.StatusChoices.PENDING,
+    )
+    initial_state = cast(
+        SyllabusState,
+        initialize_state(
+            None,
+            topic="User DB Test Topic",
+            knowledge_level="good knowledge",
+            user_id=str(test_user.pk),
+        ),
+    )
+
+    # Candidate lookup, then the joined module and lesson rows; the user row
+    # is never read because the matching syllabus already proves it exists
+    with django_assert_num_queries(2):
+        result_state = search_database(initial_state)
+
+    assert result_state["uid"] == str(existing_user_syllabus.syllabus_id)
+    assert result_state["existing_syllabus"] is not None
+    modules = result_state["existing_syllabus"]["modules"]
+    assert [module["title"] for module in modules] == ["User Mod 1", "Empty Mod 2"]
+    assert modules[1]["lessons"] == []
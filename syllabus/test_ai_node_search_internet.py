@@ -0,0 +1,122 @@
+"""Tests for the search_internet node function."""
+
+# pylint: disable=redefined-outer-name
+
+import threading
+from typing import cast
+from unittest.mock import MagicMock
+
+import pytest
+from django.core.cache import cache
+from requests import RequestException
+
+from syllabus.ai.nodes import asearch_internet, initialize_state, search_internet
+from syllabus.ai.state import SyllabusState
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """Fixture that isolates each test from cached search results."""
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.fixture
+def search_state():
+    """Fixture for a freshly initialized graph state."""
+    return cast(
+        SyllabusState,
+        initialize_state(None, topic="Search Topic", knowledge_level="beginner"),
+    )
+
+
+@pytest.fixture
+def tavily_client():
+    """Fixture for a Tavily client whose per-student query fails."""
+
+    def fake_search(query, **_):
+        if "students" in query:
+            raise RequestException("timeout")
+        return {"results": [{"content": "Snippet 1"}, {"content": ""}]}
+
+    client = MagicMock()
+    client.search.side_effect = fake_search
+    return client
+
+
+# --- Test search_internet ---
+
+
+def test_search_internet_without_client(search_state):
+    """Test that a missing Tavily client skips the search."""
+    result = search_internet(search_state, None)
+
+    assert result == {"search_results": ["Tavily client not available."]}
+
+
+def test_search_internet_collects_results_and_errors(search_state, tavily_client):
+    """Test that results and per-query errors are gathered in query order."""
+    result = search_internet(search_state, tavily_client)
+
+    assert result == {
+        "search_results": ["Snippet 1", "Error during web search: timeout"]
+    }
+    assert tavily_client.search.call_count == 2
+
+
+def test_search_internet_runs_queries_concurrently(search_state):
+    """Test that the sync node has both Tavily queries in flight at once."""
+    # Each query waits for the other; run one after another, the barrier
+    # times out and the queries come back as error entries instead
+    barrier = threading.Barrier(2, timeout=5)
+
+    def fake_search(query, **_):
+        barrier.wait()
+        return {"results": [{"content": query}]}
+
+    client = MagicMock()
+    client.search.side_effect = fake_search
+
+    result = search_internet(search_state, client)
+
+    assert result == {
+        "search_results": [
+            "Search Topic syllabus curriculum outline learning objectives",
+            "Search Topic course syllabus curriculum for Beginner students",
+        ]
+    }
+
+
+@pytest.mark.asyncio
+async def test_asearch_internet_matches_sync(search_state, tavily_client):
+    """Test that the concurrent variant returns the same ordered results."""
+    result = await asearch_internet(search_state, tavily_client)
+
+    assert result == {
+        "search_results": ["Snippet 1", "Error during web search: timeout"]
+    }
+
+
+def test_search_internet_drops_duplicate_snippets(search_state):
+    """Test that a passage returned by both queries is only kept once."""
+    client = MagicMock()
+    client.search.return_value = {
+        "results": [{"content": "Shared passage"}, {"content": " shared PASSAGE "}]
+    }
+
+    result = search_internet(search_state, client)
+
+    assert result == {"search_results": ["Shared passage"]}
+
+
+def test_search_internet_reuses_cached_query_results(search_state, tavily_client):
+    """Test that successful queries are cached and failed ones are retried."""
+    search_internet(search_state, tavily_client)
+    result = search_internet(search_state, tavily_client)
+
+    assert result == {
+        "search_results": ["Snippet 1", "Error during web search: timeout"]
+    }
+    # Only the failing query went back to Tavily on the second run
+    assert tavily_client.search.call_count == 3
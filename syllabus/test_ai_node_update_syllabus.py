@@ -0,0 +1,209 @@
+"""Tests for the update_syllabus node function."""
+
+# pylint: disable=redefined-outer-name
+
+import json
+import threading
+import time
+from typing import cast
+from unittest.mock import MagicMock
+
+import pytest
+from django.core.cache import cache
+
+from syllabus.ai.nodes import (
+    _UPDATE_INFLIGHT,
+    _build_update_prompt,
+    _single_flight,
+    _split_prompt_template,
+    initialize_state,
+    update_syllabus,
+)
+from syllabus.ai.prompts import UPDATE_PROMPT_TEMPLATE
+from syllabus.ai.state import SyllabusState
+
+CURRENT_SYLLABUS = {
+    "topic": "Update Topic",
+    "level": "Beginner",
+    "duration": "2 weeks",
+    "learning_objectives": ["Learn updating"],
+    "modules": [{"title": "Old Module", "lessons": [{"title": "Old Lesson"}]}],
+}
+
+UPDATED_SYLLABUS = {
+    **CURRENT_SYLLABUS,
+    "modules": [{"title": "New Module", "lessons": [{"title": "New Lesson"}]}],
+}
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """Fixture that isolates each test from cached updates."""
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.fixture
+def update_state():
+    """Fixture for a state holding a syllabus to update."""
+    state = cast(
+        SyllabusState,
+        initialize_state(None, topic="Update Topic", knowledge_level="beginner"),
+    )
+    state["generated_syllabus"] = CURRENT_SYLLABUS
+    return state
+
+
+@pytest.fixture
+def llm_model():
+    """Fixture for an LLM returning a valid updated syllabus."""
+    model = MagicMock()
+    model.generate_content.return_value.text = json.dumps(UPDATED_SYLLABUS)
+    return model
+
+
+# --- Test update_syllabus ---
+
+
+def test_update_syllabus_returns_parsed_llm_output(update_state, llm_model):
+    """Test that a valid LLM response replaces the generated syllabus."""
+    result = update_syllabus(update_state, "Rename the module", llm_model)
+
+    assert result == {
+        "generated_syllabus": UPDATED_SYLLABUS,
+        "user_feedback": "Rename the module",
+        "iteration_count": 1,
+    }
+    llm_model.generate_content.assert_called_once()
+
+
+def test_update_syllabus_sends_compact_json(update_state, llm_model):
+    """Test that the current syllabus is serialized without indentation."""
+    update_syllabus(update_state, "Rename the module", llm_model)
+
+    prompt = llm_model.generate_content.call_args.args[0]
+    assert json.dumps(CURRENT_SYLLABUS, separators=(",", ":")) in prompt
+    assert '\n  "topic"' not in prompt
+
+
+def test_update_syllabus_reuses_cached_update(update_state, llm_model):
+    """Test that the same feedback on the same syllabus is only sent once."""
+    update_syllabus(update_state, "Rename the module", llm_model)
+    update_state["iteration_count"] = 1
+
+    result = update_syllabus(update_state, "Rename the module", llm_model)
+
+    assert result["generated_syllabus"] == UPDATED_SYLLABUS
+    assert result["iteration_count"] == 2
+    llm_model.generate_content.assert_called_once()
+
+    update_syllabus(update_state, "Add a lesson", llm_model)
+    assert llm_model.generate_content.call_count == 2
+
+
+def test_update_syllabus_cache_ignores_trivial_differences(update_state, llm_model):
+    """Test that reordered keys and reformatted feedback hit the cached update."""
+    update_syllabus(update_state, "Rename the module", llm_model)
+    update_state["generated_syllabus"] = dict(reversed(CURRENT_SYLLABUS.items()))
+
+    result = update_syllabus(update_state, "  rename THE   module ", llm_model)
+
+    assert result["generated_syllabus"] == UPDATED_SYLLABUS
+    assert result["user_feedback"] == "  rename THE   module "
+    llm_model.generate_content.assert_called_once()
+
+
+def test_update_syllabus_does_not_cache_invalid_response(update_state):
+    """Test that an unparseable update is not cached."""
+    broken_model = MagicMock()
+    broken_model.generate_content.return_value.text = "not json"
+
+    first = update_syllabus(update_state, "Rename the module", broken_model)
+    update_syllabus(update_state, "Rename the module", broken_model)
+
+    assert "generated_syllabus" not in first
+    assert broken_model.generate_content.call_count == 2
+
+
+def test_update_syllabus_coalesces_concurrent_duplicates(update_state):
+    """Test that identical updates running at once share a single LLM call."""
+    slow_model = MagicMock()
+
+    def slow_generate(*args, **kwargs):
+        time.sleep(0.2)
+        return MagicMock(text=json.dumps(UPDATED_SYLLABUS))
+
+    slow_model.generate_content.side_effect = slow_generate
+    results = []
+    threads = [
+        threading.Thread(
+            target=lambda: results.append(
+                update_syllabus(update_state, "Rename the module", slow_model)
+            )
+        )
+        for _ in range(2)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert [r["generated_syllabus"] for r in results] == [UPDATED_SYLLABUS] * 2
+    slow_model.generate_content.assert_called_once()
+
+
+def test_single_flight_serializes_many_waiters():
+    """Test that callers queued behind one key never overlap, however many wait."""
+    inside = []
+    overlaps = []
+    guard = threading.Lock()
+
+    def worker():
+        with _single_flight("shared-key"):
+            with guard:
+                inside.append(None)
+                overlaps.append(len(inside))
+            time.sleep(0.02)
+            with guard:
+                inside.pop()
+
+    threads = [threading.Thread(target=worker) for _ in range(6)]
+    for thread in threads:
+        thread.start()
+        time.sleep(0.005)
+    for thread in threads:
+        thread.join()
+
+    assert overlaps == [1] * 6
+    assert "shared-key" not in _UPDATE_INFLIGHT
+
+
+def test_build_update_prompt_matches_template():
+    """Test that the pre-split prompt equals formatting the full template."""
+    args = {
+        "topic": "Prompt {Topic}",
+        "knowledge_level": "Beginner",
+        "syllabus_json": '{"modules":[]}',
+        "feedback": "Use {braces}",
+    }
+
+    assert _build_update_prompt(**args) == UPDATE_PROMPT_TEMPLATE.format(**args)
+
+
+def test_split_prompt_template_honours_brace_escapes():
+    """Test that escaped braces stay literal and only real fields are split out."""
+    template = 'Return {{"topic": "{topic}"}} for {{level}} {knowledge_level}'
+
+    parts = _split_prompt_template(template)
+
+    assert parts == [
+        'Return {"topic": "',
+        "topic",
+        '"} for {level} ',
+        "knowledge_level",
+        "",
+    ]
+    values = {"topic": "Sets", "knowledge_level": "beginner"}
+    parts[1::2] = [values[name] for name in parts[1::2]]
+    assert "".join(parts) == template.format(**values)
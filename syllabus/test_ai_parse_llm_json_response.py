@@ -0,0 +1,85 @@
+"""Tests for the _parse_llm_json_response helper."""
+
+# pylint: disable=protected-access
+
+import json
+
+from syllabus.ai.nodes import _parse_llm_json_response
+
+# --- Test _parse_llm_json_response ---
+
+
+def test_parse_fenced_json_block():
+    """Test extracting JSON from a ```json fenced block with surrounding text."""
+    syllabus = {"topic": "Python", "modules": []}
+    response_text = f"Here you go:\n```json\n{json.dumps(syllabus)}\n```\nEnjoy!"
+
+    assert _parse_llm_json_response(response_text) == syllabus
+
+
+def test_parse_bare_json_object():
+    """Test parsing a bare JSON object response."""
+    response_text = '  {"topic": "Rust", "level": "Beginner"}  '
+
+    assert _parse_llm_json_response(response_text) == {
+        "topic": "Rust",
+        "level": "Beginner",
+    }
+
+
+def test_parse_valid_json_skips_escape_cleanup():
+    """Test that a response that already parses keeps its escaped newlines."""
+    response_text = '{"title": "one\\ntwo", "summary": "ab"}'
+
+    assert _parse_llm_json_response(response_text) == {
+        "title": "one\ntwo",
+        "summary": "ab",
+    }
+
+
+def test_parse_strips_invalid_escapes():
+    """Test that stray backslashes and escaped newlines are removed before parsing."""
+    response_text = '{"title": "one\\ntwo", "summary": "a\\qb"}'
+
+    assert _parse_llm_json_response(response_text) == {
+        "title": "onetwo",
+        "summary": "aqb",
+    }
+
+
+def test_parse_non_json_returns_none():
+    """Test that a plain-text response yields None."""
+    assert _parse_llm_json_response("Sorry, I cannot help with that.") is None
+
+
+def test_parse_invalid_json_returns_none():
+    """Test that malformed JSON yields None rather than raising."""
+    assert _parse_llm_json_response('{"topic": "Go", }') is None
+
+
+def test_parse_non_dict_json_returns_none():
+    """Test that a fenced JSON array is rejected."""
+    assert _parse_llm_json_response("```json\n[1, 2, 3]\n```") is None
+
+
+def test_parse_ignores_braces_inside_strings():
+    """Test that braces and escaped quotes inside strings do not end the object."""
+    response_text = '```json\n{"title": "Sets {a, b}", "note": "say \\"}\\""}\n```'
+
+    assert _parse_llm_json_response(response_text) == {
+        "title": "Sets {a, b}",
+        "note": 'say "}"',
+    }
+
+
+def test_parse_json_object_surrounded_by_prose():
+    """Test that an unfenced object with text around it is still extracted."""
+    syllabus = {"topic": "SQL", "modules": [{"title": "Joins"}]}
+    response_text = f"Sure! {json.dumps(syllabus)} Hope it helps."
+
+    assert _parse_llm_json_response(response_text) == syllabus
+
+
+def test_parse_truncated_json_returns_none():
+    """Test that an object whose closing brace never arrives yields None."""
+    assert _parse_llm_json_response('{"topic": "Go", "modules": [{') is None
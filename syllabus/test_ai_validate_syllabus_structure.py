@@ -0,0 +1,51 @@
+"""Tests for the _validate_syllabus_structure helper."""
+
+# pylint: disable=protected-access
+
+import copy
+
+import pytest
+
+from syllabus.ai.nodes import _validate_syllabus_structure
+
+VALID_SYLLABUS = {
+    "topic": "Validation Topic",
+    "level": "Beginner",
+    "duration": "4 weeks",
+    "learning_objectives": ["Validate things"],
+    "modules": [
+        {
+            "title": "Module 1",
+            "lessons": [{"title": "Lesson 1.1"}, {"title": "Lesson 1.2"}],
+        }
+    ],
+}
+
+# --- Test _validate_syllabus_structure ---
+
+
+def test_validate_accepts_valid_syllabus():
+    """Test that a well-formed syllabus passes validation."""
+    assert _validate_syllabus_structure(copy.deepcopy(VALID_SYLLABUS)) is True
+
+
+@pytest.mark.parametrize(
+    "mutate",
+    [
+        lambda s: s.pop("learning_objectives"),
+        lambda s: s.update(modules=[]),
+        lambda s: s.update(modules="not a list"),
+        lambda s: s["modules"].append("not a dict"),
+        lambda s: s["modules"][0].pop("lessons"),
+        lambda s: s["modules"][0].update(lessons=[]),
+        lambda s: s["modules"][0]["lessons"].append(["not a dict"]),
+        lambda s: s["modules"][0]["lessons"][0].update(title=""),
+        lambda s: s["modules"][0]["lessons"][1].pop("title"),
+    ],
+)
+def test_validate_rejects_malformed_syllabus(mutate):
+    """Test that each structural defect causes validation to fail."""
+    syllabus = copy.deepcopy(VALID_SYLLABUS)
+    mutate(syllabus)
+
+    assert _validate_syllabus_structure(syllabus, "Test") is False
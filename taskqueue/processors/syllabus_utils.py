@@ -1,4 +1,5 @@
 import logging
+from asgiref.sync import async_to_sync
 from syllabus.ai.syllabus_graph import SyllabusAI
 from core.models import Syllabus, LessonContent
 from taskqueue.models import AITask
@@ -34,9 +35,10 @@ def process_syllabus_generation(task):
     syllabus_ai = SyllabusAI()
     syllabus_ai.initialize(topic, knowledge_level, user_id)
 
-    # Run synchronously using the sync method
+    # Drive the graph's async path: the Tavily queries run concurrently and
+    # Gemini is awaited, while the DB nodes hop back to this worker thread
     try:
-        result_state = syllabus_ai.get_or_create_syllabus_sync()
+        result_state = async_to_sync(syllabus_ai.aget_or_create_syllabus)()
 
         # Extract the syllabus from the state
         syllabus = result_state.get("generated_syllabus") or result_state.get(
@@ -90,4 +92,4 @@ def process_syllabus_generation(task):
 
     except Exception as e:
         logger.error(f"Error in syllabus generation: {str(e)}", exc_info=True)
-        raise
\ No newline at end of file
+        raise
\ No newline at end of file
@@ -1,3 +1,22 @@
-from django.test import TestCase
+"""Tests for the taskqueue processors."""
 
-# Create your tests here.
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from taskqueue.processors.syllabus_utils import process_syllabus_generation
+
+
+def test_process_syllabus_generation_runs_async_graph():
+    """Test that the syllabus processor drives the graph's async path."""
+    task = MagicMock(input_data={"topic": "Queue Topic", "knowledge_level": "beginner"})
+    syllabus = {"topic": "Queue Topic", "modules": []}
+
+    with patch("taskqueue.processors.syllabus_utils.SyllabusAI") as mock_ai_class:
+        syllabus_ai = mock_ai_class.return_value
+        syllabus_ai.aget_or_create_syllabus = AsyncMock(
+            return_value={"generated_syllabus": syllabus}
+        )
+        result = process_syllabus_generation(task)
+
+    syllabus_ai.aget_or_create_syllabus.assert_awaited_once()
+    syllabus_ai.get_or_create_syllabus_sync.assert_not_called()
+    assert result["syllabus"] == syllabus
@@ -284,6 +284,10 @@ ONBOARDING_HARD_DIFFICULTY_THRESHOLD = 3 # Match constants.py (Advanced=3)
 ASSESSMENT_STATE_KEY = 'assessment_state' # Session key
 
 TAVILY_API_KEY = env('TAVILY_API_KEY', default=None)
+TAVILY_MAX_CONCURRENCY = 8 # Process-wide cap on in-flight Tavily requests
+
+# Syllabus Save Settings
+SYLLABUS_BULK_BATCH_SIZE = 500 # Rows per INSERT/UPDATE when saving modules/lessons
 
 
 STATIC_URL = "static/"